@@ -11,7 +11,7 @@ import os
 import logging
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import Any, Callable, Optional, List
 from functools import lru_cache
 
 import streamlit as st
@@ -21,84 +21,130 @@ from dotenv import load_dotenv
 env_path = Path(__file__).parent.parent / ".env"
 load_dotenv(env_path)
 
+# Snapshot of the environment (including .env) read by every config field
+_ENV = dict(os.environ)
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _env_field(name: str, default: Any, cast: Optional[Callable[[str], Any]] = None) -> Any:
+    """
+    Declare a dataclass field whose default is read from an environment variable.
+
+    Args:
+        name: Environment variable name
+        default: Value used when the variable is unset or empty
+        cast: Conversion for the raw string (defaults to the type of ``default``)
+    """
+    cast = cast or type(default)
+
+    def factory() -> Any:
+        value = _ENV.get(name)
+        if not value:
+            return default
+        if cast is bool:
+            return value.lower() in ("true", "1", "yes")
+        return cast(value)
+
+    return field(default_factory=factory)
+
+
+@lru_cache(maxsize=1)
+def _load_groq_api_key() -> str:
+    """
+    Load the Groq API key from Streamlit secrets, falling back to the environment.
+
+    Cached because every st.secrets access re-checks the secrets files.
+    """
+    # Priority 1: Streamlit secrets (raises when no secrets file exists)
+    try:
+        if "GROQ_API_KEY" in st.secrets:
+            return st.secrets["GROQ_API_KEY"]
+    except Exception as e:
+        logger.debug(f"Streamlit secrets unavailable: {e}")
+
+    # Priority 2: Environment variable
+    return _ENV.get("GROQ_API_KEY", "")
+
+
+@dataclass(frozen=True, slots=True)
 class GroqConfig:
     """Groq API configuration."""
-    api_key: str = ""
-    model_name: str = "llama-3.1-8b-instant"
+    api_key: str = field(default_factory=_load_groq_api_key)
+    model_name: str = _env_field("MODEL_NAME", "llama-3.1-8b-instant")
     temperature: float = 0.3
     max_tokens: int = 2048
-    timeout: int = 30
+    timeout: float = _env_field("GROQ_TIMEOUT", 30.0)
+    connect_timeout: float = 3.05
+    max_retries: int = _env_field("GROQ_MAX_RETRIES", 3)
+    pool_size: int = _env_field("GROQ_POOL_SIZE", 16)
 
     def __post_init__(self):
-        """Validate and load API key from various sources."""
-        # Priority 1: Streamlit secrets
-        if "GROQ_API_KEY" in st.secrets:
-            self.api_key = st.secrets["GROQ_API_KEY"]
-        # Priority 2: Environment variable
-        elif env_key := os.getenv("GROQ_API_KEY"):
-            self.api_key = env_key
-        # Priority 3: Use whatever was set (or empty)
-
-        # Load model from env if available
-        if model := os.getenv("MODEL_NAME"):
-            self.model_name = model
-
+        """Warn when no API key could be found."""
         if not self.api_key:
             logger.warning("GROQ_API_KEY not configured")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RAGConfig:
     """RAG (Retrieval-Augmented Generation) configuration."""
-    chunk_size: int = 1000
-    chunk_overlap: int = 200
-    top_k_results: int = 5
-    similarity_threshold: float = 0.7
+    chunk_size: int = _env_field("CHUNK_SIZE", 1000)
+    chunk_overlap: int = _env_field("CHUNK_OVERLAP", 200)
+    top_k_results: int = _env_field("TOP_K_RESULTS", 5)
+    similarity_threshold: float = _env_field("SIMILARITY_THRESHOLD", 0.7)
+    retrieval_cache_size: int = _env_field("RETRIEVAL_CACHE_SIZE", 256)
+    query_batch_wait_ms: float = _env_field("QUERY_BATCH_WAIT_MS", 5.0)
     embedding_model: str = "all-MiniLM-L6-v2"
-
-    def __post_init__(self):
-        """Load RAG settings from environment."""
-        if chunk_size := os.getenv("CHUNK_SIZE"):
-            self.chunk_size = int(chunk_size)
-        if chunk_overlap := os.getenv("CHUNK_OVERLAP"):
-            self.chunk_overlap = int(chunk_overlap)
-        if top_k := os.getenv("TOP_K_RESULTS"):
-            self.top_k_results = int(top_k)
-        if threshold := os.getenv("SIMILARITY_THRESHOLD"):
-            self.similarity_threshold = float(threshold)
-
-
-@dataclass
+    embedding_batch_size: int = _env_field("EMBEDDING_BATCH_SIZE", 256)
+    embedding_batch_wait_ms: float = _env_field("EMBEDDING_BATCH_WAIT_MS", 5.0)
+    embedding_cache_enabled: bool = _env_field("EMBEDDING_CACHE_ENABLED", True)
+    use_hnsw: bool = _env_field("USE_HNSW", True)
+    use_gpu: bool = _env_field("USE_GPU", True)
+    vector_quantization: str = _env_field("VECTOR_QUANTIZATION", "fp16", str.lower)
+    keyword_fallback: bool = _env_field("KEYWORD_FALLBACK", True)
+    skip_llm_without_context: bool = _env_field("SKIP_LLM_WITHOUT_CONTEXT", True)
+    index_cache_enabled: bool = _env_field("INDEX_CACHE_ENABLED", True)
+    search_cache_enabled: bool = _env_field("SEARCH_CACHE_ENABLED", True)
+    search_cache_threshold: float = _env_field("SEARCH_CACHE_THRESHOLD", 0.97)
+    response_cache_enabled: bool = _env_field("RESPONSE_CACHE_ENABLED", True)
+    response_cache_threshold: float = _env_field("RESPONSE_CACHE_THRESHOLD", 0.95)
+    response_cache_size: int = _env_field("RESPONSE_CACHE_SIZE", 1024)
+
+
+@dataclass(frozen=True, slots=True)
 class DataSourceConfig:
     """Data source configuration."""
-    default_pdf_path: str = "reference/Academic-Policy-Manual-for-Students2.pdf"
-    scrape_url: str = "https://iqra.edu.pk/iu-policies/"
-    scrape_enabled: bool = True
-    cache_dir: str = "data/cache"
+    default_pdf_path: str = _env_field(
+        "DEFAULT_PDF_PATH", "reference/Academic-Policy-Manual-for-Students2.pdf"
+    )
+    scrape_url: str = _env_field("SCRAPE_URL", "https://iqra.edu.pk/iu-policies/")
+    scrape_enabled: bool = _env_field("SCRAPE_ENABLED", True)
+    cache_dir: str = _env_field("CACHE_DIR", "data/cache")
+    pdf_cache_enabled: bool = _env_field("PDF_CACHE_ENABLED", True)
+    pdf_extractor: str = _env_field("PDF_EXTRACTOR", "pdfium", str.lower)
+    pdf_parallel_workers: int = _env_field("PDF_PARALLEL_WORKERS", 0)
 
-    def __post_init__(self):
-        """Load data source settings from environment."""
-        if pdf_path := os.getenv("DEFAULT_PDF_PATH"):
-            self.default_pdf_path = pdf_path
-        if scrape_url := os.getenv("SCRAPE_URL"):
-            self.scrape_url = scrape_url
-        if scrape_enabled := os.getenv("SCRAPE_ENABLED"):
-            self.scrape_enabled = scrape_enabled.lower() in ("true", "1", "yes")
-        if cache_dir := os.getenv("CACHE_DIR"):
-            self.cache_dir = cache_dir
-
-
-@dataclass
+    @property
+    def project_root(self) -> Path:
+        """Get the project root directory."""
+        return Path(__file__).parent.parent
+
+    @property
+    def cache_path(self) -> Path:
+        """Get the absolute cache directory."""
+        return self.project_root / self.cache_dir
+
+
+@dataclass(frozen=True, slots=True)
 class UIConfig:
     """UI configuration."""
-    app_title: str = "Z.M.ai"
+    app_title: str = _env_field("APP_TITLE", "Z.M.ai")
     app_subtitle: str = "RAG-based Academic Policy Assistant"
-    max_history: int = 50
-    theme_color: str = "#8b5cf6"
+    max_history: int = _env_field("MAX_HISTORY", 50)
+    theme_color: str = _env_field("THEME_COLOR", "#8b5cf6")
+    stream_batch_min: int = _env_field("STREAM_BATCH_MIN", 1)
+    stream_batch_growth: float = _env_field("STREAM_BATCH_GROWTH", 3.0)
+    stream_batch_cap: int = _env_field("STREAM_BATCH_CAP", 20)
     show_sources: bool = True
     welcome_message: str = (
         "👋 Welcome to **Z.M.ai**! I'm your academic policy assistant.\n\n"
@@ -110,29 +156,15 @@ class UIConfig:
         "Feel free to ask me anything about university policies!"
     )
 
-    def __post_init__(self):
-        """Load UI settings from environment."""
-        if title := os.getenv("APP_TITLE"):
-            self.app_title = title
-        if max_hist := os.getenv("MAX_HISTORY"):
-            self.max_history = int(max_hist)
-        if color := os.getenv("THEME_COLOR"):
-            self.theme_color = color
-
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LoggingConfig:
     """Logging configuration."""
-    level: str = "INFO"
+    level: str = _env_field("LOG_LEVEL", "INFO", str.upper)
     format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-    def __post_init__(self):
-        """Load logging settings from environment."""
-        if level := os.getenv("LOG_LEVEL"):
-            self.level = level.upper()
-
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Config:
     """Main configuration class holding all sub-configurations."""
     groq: GroqConfig = field(default_factory=GroqConfig)
@@ -167,6 +199,13 @@ class Config:
         if not self.groq.api_key:
             errors.append("GROQ_API_KEY is required")
 
+        if self.groq.timeout <= 0:
+            errors.append("GROQ_TIMEOUT must be positive")
+        if self.groq.max_retries < 0:
+            errors.append("GROQ_MAX_RETRIES must be non-negative")
+        if self.groq.pool_size <= 0:
+            errors.append("GROQ_POOL_SIZE must be positive")
+
         # Validate RAG settings
         if self.rag.chunk_size <= 0:
             errors.append("CHUNK_SIZE must be positive")
@@ -176,6 +215,36 @@ class Config:
             errors.append("CHUNK_OVERLAP must be less than CHUNK_SIZE")
         if not (0 <= self.rag.similarity_threshold <= 1):
             errors.append("SIMILARITY_THRESHOLD must be between 0 and 1")
+        if self.rag.retrieval_cache_size < 0:
+            errors.append("RETRIEVAL_CACHE_SIZE must be non-negative")
+        if self.rag.query_batch_wait_ms < 0:
+            errors.append("QUERY_BATCH_WAIT_MS must be non-negative")
+        if self.rag.embedding_batch_size <= 0:
+            errors.append("EMBEDDING_BATCH_SIZE must be positive")
+        if self.rag.embedding_batch_wait_ms < 0:
+            errors.append("EMBEDDING_BATCH_WAIT_MS must be non-negative")
+        if self.rag.vector_quantization not in ("none", "fp16", "int8"):
+            errors.append("VECTOR_QUANTIZATION must be 'none', 'fp16' or 'int8'")
+        if not (0 <= self.rag.search_cache_threshold <= 1):
+            errors.append("SEARCH_CACHE_THRESHOLD must be between 0 and 1")
+        if not (0 <= self.rag.response_cache_threshold <= 1):
+            errors.append("RESPONSE_CACHE_THRESHOLD must be between 0 and 1")
+        if self.rag.response_cache_size <= 0:
+            errors.append("RESPONSE_CACHE_SIZE must be positive")
+
+        # Validate data source settings
+        if self.data_source.pdf_extractor not in ("pdfium", "pdfplumber"):
+            errors.append("PDF_EXTRACTOR must be 'pdfium' or 'pdfplumber'")
+        if self.data_source.pdf_parallel_workers < 0:
+            errors.append("PDF_PARALLEL_WORKERS must be non-negative")
+
+        # Validate UI settings
+        if self.ui.stream_batch_min < 1:
+            errors.append("STREAM_BATCH_MIN must be at least 1")
+        if self.ui.stream_batch_growth < 1:
+            errors.append("STREAM_BATCH_GROWTH must be at least 1")
+        if self.ui.stream_batch_cap < self.ui.stream_batch_min:
+            errors.append("STREAM_BATCH_CAP must not be less than STREAM_BATCH_MIN")
 
         if errors:
             raise ValueError("Configuration validation failed:\n" + "\n".join(f"  - {e}" for e in errors))
@@ -193,15 +262,16 @@ class Config:
         logger.setLevel(log_level)
 
 
-@lru_cache
+# Built once at import; the frozen dataclasses make it safe to share
+CONFIG = Config()
+CONFIG.setup_logging()
+
+
 def get_config() -> Config:
     """
     Get the singleton configuration instance.
-    This is cached to avoid reloading configuration on every call.
     """
-    config = Config()
-    config.setup_logging()
-    return config
+    return CONFIG
 
 
 def get_config_with_validation() -> Config:
@@ -16,16 +16,21 @@ from .text_processor import (
     TextChunker,
     TextProcessor,
 )
+from .keyword_index import KeywordIndex
+from .embedding_cache import EmbeddingCache
 from .embeddings import (
     EmbeddingModel,
     VectorStore,
     EmbeddingManager,
+    clear_index_cache,
 )
 from .retriever import (
     RetrievalResult,
     Retriever,
     RAGPipeline,
 )
+from .query_batcher import QueryBatcher
+from .response_cache import SemanticResponseCache
 from .llm_handler import (
     LLMResponse,
     GroqHandler,
@@ -42,12 +47,17 @@ __all__ = [
     "TextCleaner",
     "TextChunker",
     "TextProcessor",
+    "KeywordIndex",
+    "EmbeddingCache",
     "EmbeddingModel",
     "VectorStore",
     "EmbeddingManager",
+    "clear_index_cache",
     "RetrievalResult",
     "Retriever",
     "RAGPipeline",
+    "QueryBatcher",
+    "SemanticResponseCache",
     "LLMResponse",
     "GroqHandler",
     "RAGLLMHandler",
@@ -0,0 +1,120 @@
+"""
+Z.M.ai - Embedding Cache
+
+Persistent cache of chunk embeddings so re-indexing only embeds new text.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed cache of embedding vectors.
+
+    Keys are SHA-256 digests of the text, prefixed with a tag of the model
+    name so vectors from different models never mix. Vectors are stored as
+    raw float32 bytes.
+    """
+
+    def __init__(self, path: Path, model_name: str, embedding_dim: int):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite database file
+            model_name: Embedding model the vectors come from
+            embedding_dim: Dimension of the stored vectors
+        """
+        self.path = Path(path)
+        self.embedding_dim = embedding_dim
+        self._model_tag = hashlib.sha256(model_name.encode("utf-8")).digest()[:8]
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Streamlit serves sessions from several threads; the lock serializes access
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS emb (key BLOB PRIMARY KEY, vec BLOB)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def _key(self, text: str) -> bytes:
+        """Get the cache key of a text."""
+        return self._model_tag + hashlib.sha256(text.encode("utf-8")).digest()
+
+    def get_many(self, texts: List[str]) -> Tuple[np.ndarray, List[int]]:
+        """
+        Look up the embeddings of several texts.
+
+        Args:
+            texts: Texts to look up
+
+        Returns:
+            Tuple of (embedding matrix with hits filled in, indices of the misses)
+        """
+        embeddings = np.zeros((len(texts), self.embedding_dim), dtype=np.float32)
+        keys = [self._key(text) for text in texts]
+
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                found.update(self._conn.execute(
+                    f"SELECT key, vec FROM emb WHERE key IN ({placeholders})", batch
+                ))
+
+        misses = []
+        for i, key in enumerate(keys):
+            vec = found.get(key)
+            if vec is not None and len(vec) == self.embedding_dim * 4:
+                embeddings[i] = np.frombuffer(vec, dtype=np.float32)
+            else:
+                misses.append(i)
+
+        return embeddings, misses
+
+    def put_many(self, texts: List[str], embeddings: np.ndarray):
+        """
+        Store the embeddings of several texts.
+
+        Args:
+            texts: Embedded texts
+            embeddings: Their embeddings, in the same order
+        """
+        rows = [
+            (self._key(text), np.asarray(vec, dtype=np.float32).tobytes())
+            for text, vec in zip(texts, embeddings)
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO emb (key, vec) VALUES (?, ?)", rows)
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def open_embedding_cache(path: Path, model_name: str, embedding_dim: int) -> Optional[EmbeddingCache]:
+    """
+    Open an embedding cache, or return None if the database is unusable.
+
+    Args:
+        path: SQLite database file
+        model_name: Embedding model the vectors come from
+        embedding_dim: Dimension of the stored vectors
+    """
+    try:
+        return EmbeddingCache(path, model_name, embedding_dim)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Embedding cache unavailable at {path}: {e}")
+        return None
@@ -4,19 +4,131 @@ Z.M.ai - Embeddings Module
 Handles vector embeddings using sentence-transformers (local, free).
 """
 
+import hashlib
 import logging
+import os
+import pickle
+import shutil
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional, Tuple
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import faiss
 
 from config import get_rag_config, get_data_source_config
 from .text_processor import TextChunk
+from .keyword_index import KeywordIndex
+from .embedding_cache import EmbeddingCache, open_embedding_cache
+from .micro_batcher import MicroBatcher
+from .response_cache import ExactCache, SemanticResponseCache
 
 logger = logging.getLogger(__name__)
 
+# Below this many chunks an exact flat scan is faster than an HNSW graph walk
+HNSW_MIN_CHUNKS = 2000
+
+# Bump when the persisted index or chunk format changes to invalidate cached indexes
+INDEX_CACHE_VERSION = 2
+
+# VECTOR_QUANTIZATION values -> FAISS scalar quantizer types (None keeps float32)
+QUANTIZER_TYPES = {
+    "none": None,
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+@lru_cache(maxsize=2)
+def load_sentence_transformer(model_name: str):
+    """
+    Load a sentence-transformers model once per process.
+
+    Every EmbeddingModel (the pipeline's, the response cache's, a rebuilt
+    pipeline after the sources change) shares the same weights instead of
+    spending a second and ~90 MB per load.
+
+    Args:
+        model_name: Name of the sentence-transformers model
+
+    Returns:
+        Loaded SentenceTransformer
+    """
+    # Imported here: sentence-transformers pulls in torch, which takes
+    # seconds and would otherwise delay the first render of the page
+    from sentence_transformers import SentenceTransformer
+
+    logger.info(f"Loading embedding model: {model_name}")
+    model = SentenceTransformer(model_name)
+
+    # Half precision halves memory traffic on GPU; CPU kernels stay fp32
+    if model.device.type == "cuda":
+        model.half()
+
+    return model
+
+
+class BatchedEncoder(MicroBatcher):
+    """
+    Coalesces concurrent single-text encode calls into batched forward passes.
+
+    Streamlit serves every session from its own thread. Instead of each one
+    running a separate one-row forward pass, a background thread collects the
+    texts that arrive within max_wait seconds of each other (up to max_batch)
+    and encodes them together.
+    """
+
+    def __init__(self, model, max_batch: int = 32, max_wait: float = 0.005):
+        """
+        Create the encoder (the batching thread starts on the first request).
+
+        Args:
+            model: Loaded SentenceTransformer
+            max_batch: Maximum texts per forward pass
+            max_wait: Seconds to wait for more texts after the first one arrives
+        """
+        super().__init__(max_batch, max_wait, name="embedding-batcher")
+        self.model = model
+
+    def encode(self, text: str) -> np.ndarray:
+        """
+        Embed one text, blocking until its batch has been encoded.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Normalized embedding vector
+        """
+        return self._submit(text).result()
+
+    def _process_batch(self, texts: List[str]) -> np.ndarray:
+        """Encode one batch of texts in a single forward pass."""
+        return self.model.encode(
+            texts,
+            batch_size=self.max_batch,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+
+
+@lru_cache(maxsize=2)
+def get_batched_encoder(model_name: str) -> BatchedEncoder:
+    """
+    Get the query encoder shared by every EmbeddingModel of a model.
+
+    Args:
+        model_name: Name of the sentence-transformers model
+
+    Returns:
+        BatchedEncoder running on the shared model
+    """
+    return BatchedEncoder(
+        load_sentence_transformer(model_name),
+        max_wait=get_rag_config().embedding_batch_wait_ms / 1000,
+    )
+
 
 class EmbeddingModel:
     """Wrapper for sentence-transformers embedding model."""
@@ -31,11 +143,13 @@ class EmbeddingModel:
         self.config = get_rag_config()
         self.model_name = model_name or self.config.embedding_model
 
-        logger.info(f"Loading embedding model: {self.model_name}")
-        self.model = SentenceTransformer(self.model_name)
+        self.model = load_sentence_transformer(self.model_name)
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
 
-        logger.info(f"Embedding model loaded: dimension={self.embedding_dim}")
+        # Opened on first use by embed_chunks
+        self._cache: Optional[EmbeddingCache] = None
+
+        logger.info(f"Embedding model ready: dimension={self.embedding_dim}")
 
     def embed_text(self, text: str) -> np.ndarray:
         """
@@ -47,7 +161,9 @@ class EmbeddingModel:
         Returns:
             Embedding vector as numpy array
         """
-        return self.model.encode(text, convert_to_numpy=True)
+        # Concurrent queries from other sessions share one forward pass
+        embedding = get_batched_encoder(self.model_name).encode(text)
+        return embedding.astype(np.float32, copy=False)
 
     def embed_texts(self, texts: List[str]) -> np.ndarray:
         """
@@ -59,12 +175,23 @@ class EmbeddingModel:
         Returns:
             Embedding matrix as numpy array (shape: [n_texts, embedding_dim])
         """
-        return self.model.encode(texts, convert_to_numpy=True, show_progress_bar=True)
+        embeddings = self.model.encode(
+            texts,
+            batch_size=self.config.embedding_batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=True,
+        )
+        # FAISS requires float32 (fp16 models return float16)
+        return embeddings.astype(np.float32, copy=False)
 
     def embed_chunks(self, chunks: List[TextChunk]) -> np.ndarray:
         """
         Generate embeddings for text chunks.
 
+        With the embedding cache enabled, chunks embedded in any earlier run
+        are read from disk and only the remaining ones go through the model.
+
         Args:
             chunks: List of TextChunk objects
 
@@ -72,11 +199,40 @@ class EmbeddingModel:
             Embedding matrix as numpy array
         """
         texts = [chunk.content for chunk in chunks]
-        return self.embed_texts(texts)
+
+        cache = self._get_cache()
+        if cache is None or not texts:
+            return self.embed_texts(texts)
+
+        embeddings, misses = cache.get_many(texts)
+        logger.info(f"Embedding cache: {len(texts) - len(misses)} hits, {len(misses)} misses")
+
+        if misses:
+            miss_texts = [texts[i] for i in misses]
+            miss_embeddings = self.embed_texts(miss_texts)
+            embeddings[misses] = miss_embeddings
+            cache.put_many(miss_texts, miss_embeddings)
+
+        return embeddings
+
+    def _get_cache(self) -> Optional[EmbeddingCache]:
+        """Get the on-disk embedding cache, opening it on first use."""
+        if self._cache is None and self.config.embedding_cache_enabled:
+            self._cache = open_embedding_cache(
+                get_data_source_config().cache_path / "embeddings.sqlite3",
+                self.model_name,
+                self.embedding_dim,
+            )
+        return self._cache
 
 
 class VectorStore:
-    """FAISS-based vector store for similarity search."""
+    """
+    FAISS-based vector store for similarity search.
+
+    Stored and query vectors must be unit-norm (EmbeddingModel encodes with
+    normalize_embeddings=True), so inner product equals cosine similarity.
+    """
 
     def __init__(self, embedding_dim: int):
         """
@@ -85,67 +241,188 @@ class VectorStore:
         Args:
             embedding_dim: Dimension of embedding vectors
         """
+        self.config = get_rag_config()
         self.embedding_dim = embedding_dim
         self.index: Optional[faiss.Index] = None
         self.chunks: List[TextChunk] = []
         self.is_built = False
+        self.is_mmapped = False
+        self._gpu_resources = None
+
+    @property
+    def gpu_available(self) -> bool:
+        """Whether the index should live on a GPU (faiss-gpu build with a visible device)."""
+        return (
+            self.config.use_gpu
+            and hasattr(faiss, "StandardGpuResources")
+            and faiss.get_num_gpus() > 0
+        )
+
+    def _to_device(self, index: faiss.Index) -> faiss.Index:
+        """
+        Move an index onto GPU 0 when one is available.
+
+        Index types without a GPU implementation (e.g. HNSW) stay on the CPU.
+        """
+        if not self.gpu_available:
+            return index
+
+        try:
+            # The resources must outlive the GPU index, so keep them on self
+            if self._gpu_resources is None:
+                self._gpu_resources = faiss.StandardGpuResources()
+            return faiss.index_cpu_to_gpu(self._gpu_resources, 0, index)
+        except Exception as e:
+            logger.warning(f"Keeping FAISS index on CPU: {e}")
+            return index
 
-    def build_index(self, chunks: List[TextChunk], embeddings: Optional[np.ndarray] = None):
+    def _new_index(self, n_vectors: int) -> faiss.Index:
+        """
+        Create an empty inner-product index sized for n_vectors.
+
+        Large corpora get an HNSW graph (logarithmic search, near-exact
+        recall); small ones keep the exact flat scan. Vectors are stored
+        scalar-quantized per VECTOR_QUANTIZATION: fp16 halves memory and scan
+        bandwidth at no measurable recall cost on normalized embeddings.
+        """
+        qtype = QUANTIZER_TYPES[self.config.vector_quantization]
+        metric = faiss.METRIC_INNER_PRODUCT
+
+        if self.config.use_hnsw and n_vectors >= HNSW_MIN_CHUNKS:
+            if qtype is None:
+                index = faiss.IndexHNSWFlat(self.embedding_dim, 32, metric)
+            else:
+                index = faiss.IndexHNSWSQ(self.embedding_dim, qtype, 32, metric)
+            index.hnsw.efConstruction = 200
+            index.hnsw.efSearch = 64
+            return index
+
+        if qtype is None:
+            return faiss.IndexFlatIP(self.embedding_dim)
+        return faiss.IndexScalarQuantizer(self.embedding_dim, qtype, metric)
+
+    def _add_vectors(self, index: faiss.Index, embeddings: np.ndarray):
+        """Add vectors to an index, training its quantizer first if needed."""
+        embeddings = embeddings.astype("float32")
+        if not index.is_trained:
+            index.train(embeddings)
+        index.add(embeddings)
+
+    def build_index(
+        self,
+        chunks: List[TextChunk],
+        embeddings: Optional[np.ndarray] = None,
+        embedding_model: Optional[EmbeddingModel] = None,
+    ):
         """
         Build the FAISS index from chunks and embeddings.
 
         Args:
             chunks: List of TextChunk objects
             embeddings: Pre-computed embeddings (optional, will compute if None)
+            embedding_model: Model used when embeddings is None (defaults to the configured one)
         """
         if not chunks:
             logger.warning("No chunks to build index from")
             return
 
-        self.chunks = chunks
+        self.chunks = list(chunks)
 
         if embeddings is None:
             # Compute embeddings
-            embedding_model = EmbeddingModel()
+            embedding_model = embedding_model or EmbeddingModel()
             embeddings = embedding_model.embed_chunks(chunks)
 
-        # Normalize embeddings for cosine similarity
-        faiss.normalize_L2(embeddings)
-
         # Create FAISS index (using Inner Product for cosine similarity)
-        self.index = faiss.IndexFlatIP(self.embedding_dim)
-        self.index.add(embeddings.astype("float32"))
+        self.index = self._to_device(self._new_index(len(chunks)))
+        self._add_vectors(self.index, embeddings)
 
         self.is_built = True
+        self.is_mmapped = False
         logger.info(f"Built FAISS index with {len(chunks)} chunks")
 
-    def search(self, query_embedding: np.ndarray, top_k: int = 5) -> List[Tuple[int, float]]:
+    def add_to_index(self, chunks: List[TextChunk], embeddings: np.ndarray):
+        """
+        Append chunks to the index in place, building it if needed.
+
+        Args:
+            chunks: List of TextChunk objects
+            embeddings: Embeddings for the chunks, in the same order
+        """
+        if not chunks:
+            return
+
+        if not self.is_built:
+            self.build_index(chunks, embeddings)
+            return
+
+        # A memory-mapped index is a read-only view; copy it into RAM first
+        if self.is_mmapped:
+            in_memory = self._to_device(self._new_index(self.index.ntotal))
+            self._add_vectors(in_memory, self.index.reconstruct_n(0, self.index.ntotal))
+            self.index = in_memory
+            self.is_mmapped = False
+
+        self.index.add(embeddings.astype("float32"))
+        self.chunks.extend(chunks)
+
+        logger.info(f"Added {len(chunks)} chunks to FAISS index (total={len(self.chunks)})")
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 5,
+        min_score: Optional[float] = None,
+    ) -> List[Tuple[int, float]]:
         """
         Search for similar chunks.
 
         Args:
             query_embedding: Query embedding vector
             top_k: Number of results to return
+            min_score: Drop results scoring below this similarity
 
         Returns:
             List of (chunk_index, score) tuples
         """
+        return self.search_batch(query_embedding.reshape(1, -1), top_k, min_score)[0]
+
+    def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: int = 5,
+        min_score: Optional[float] = None,
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Search for chunks similar to several queries with a single index call.
+
+        Args:
+            query_embeddings: Query embedding matrix (one row per query)
+            top_k: Number of results to return per query
+            min_score: Drop results scoring below this similarity
+
+        Returns:
+            One list of (chunk_index, score) tuples per query
+        """
         if not self.is_built:
             logger.error("Cannot search: index not built")
-            return []
-
-        # Normalize query embedding for cosine similarity
-        faiss.normalize_L2(query_embedding.reshape(1, -1))
+            return [[] for _ in range(len(query_embeddings))]
 
-        # Search
-        scores, indices = self.index.search(query_embedding.reshape(1, -1).astype("float32"), min(top_k, len(self.chunks)))
+        # Search (the embeddings are already unit-norm)
+        scores, indices = self.index.search(
+            np.ascontiguousarray(query_embeddings, dtype=np.float32),
+            min(top_k, len(self.chunks)),
+        )
 
-        results = []
-        for idx, score in zip(indices[0], scores[0]):
-            if idx >= 0:  # FAISS returns -1 for empty results
-                results.append((int(idx), float(score)))
+        # Filter in one vectorized pass; FAISS returns -1 for empty results
+        mask = indices >= 0
+        if min_score is not None:
+            mask &= scores >= np.float32(min_score)
 
-        return results
+        return [
+            list(zip(row_indices[row_mask].tolist(), row_scores[row_mask].tolist()))
+            for row_indices, row_scores, row_mask in zip(indices, scores, mask)
+        ]
 
     def get_chunk(self, index: int) -> Optional[TextChunk]:
         """Get chunk by index."""
@@ -169,27 +446,25 @@ class VectorStore:
 
         # Save FAISS index
         index_path = path / "index.faiss"
-        faiss.write_index(self.index, str(index_path))
-
-        # Save chunks metadata (simplified - just save the text content)
-        # In production, you might want to use a proper serialization format
-        chunks_path = path / "chunks.txt"
-        with open(chunks_path, "w", encoding="utf-8") as f:
-            for chunk in self.chunks:
-                f.write(f"--- CHUNK {chunk.chunk_index} ---\n")
-                f.write(f"Source: {chunk.source}\n")
-                f.write(f"Type: {chunk.source_type}\n")
-                f.write(f"Content: {chunk.content}\n")
-                f.write("\n")
+        cpu_index = self.index
+        if self.gpu_available and hasattr(cpu_index, "getDevice"):
+            cpu_index = faiss.index_gpu_to_cpu(cpu_index)
+        faiss.write_index(cpu_index, str(index_path))
+
+        # Save chunks so the index can be restored without re-chunking
+        with open(path / "chunks.pkl", "wb") as f:
+            pickle.dump(self.chunks, f, protocol=pickle.HIGHEST_PROTOCOL)
 
         logger.info(f"Saved index to {path}")
 
-    def load(self, path: Path):
+    def load(self, path: Path, mmap: bool = True):
         """
         Load the index from disk.
 
         Args:
             path: Directory containing index files
+            mmap: Memory-map the vectors instead of reading them into RAM,
+                so the index opens instantly and pages are loaded on demand
         """
         path = Path(path)
 
@@ -198,8 +473,28 @@ class VectorStore:
             logger.error(f"Index file not found: {index_path}")
             return
 
-        self.index = faiss.read_index(str(index_path))
+        chunks_path = path / "chunks.pkl"
+        if chunks_path.exists():
+            with open(chunks_path, "rb") as f:
+                self.chunks = pickle.load(f)
+
+        # A GPU copy needs the whole index in memory anyway
+        mmap = mmap and not self.gpu_available
+
+        if mmap:
+            mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+            try:
+                self.index = faiss.read_index(str(index_path), mmap_flag | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError as e:
+                # Not every index type or FAISS build supports memory mapping
+                logger.warning(f"Cannot memory-map {index_path}, reading it into memory: {e}")
+                mmap = False
+
+        if not mmap:
+            self.index = self._to_device(faiss.read_index(str(index_path)))
+
         self.is_built = True
+        self.is_mmapped = mmap
 
         logger.info(f"Loaded index from {path}")
 
@@ -212,6 +507,28 @@ class EmbeddingManager:
         self.data_config = get_data_source_config()
         self.embedding_model = EmbeddingModel()
         self.vector_store = VectorStore(self.embedding_model.embedding_dim)
+        self.keyword_index = KeywordIndex()
+        self._chunk_hashes: set = set()
+
+        # Results of earlier searches, reused for near-identical query embeddings
+        self._search_cache = SemanticResponseCache(
+            self.embedding_model.embedding_dim,
+            threshold=self.config.search_cache_threshold,
+            name="Search",
+        )
+
+        # Exact (query, top_k, threshold) repeats, e.g. from Streamlit reruns
+        self._exact_search_cache = ExactCache(512)
+
+    def _filter_new_chunks(self, chunks: List[TextChunk]) -> List[TextChunk]:
+        """Drop chunks whose content is already indexed (or repeated in the batch)."""
+        new_chunks = []
+        for chunk in chunks:
+            digest = hashlib.md5(chunk.content.encode("utf-8")).hexdigest()
+            if digest not in self._chunk_hashes:
+                self._chunk_hashes.add(digest)
+                new_chunks.append(chunk)
+        return new_chunks
 
     def create_index(self, chunks: List[TextChunk]) -> VectorStore:
         """
@@ -229,22 +546,77 @@ class EmbeddingManager:
 
         logger.info(f"Creating index from {len(chunks)} chunks...")
 
+        # Skip duplicate chunk texts so each is embedded only once
+        self._chunk_hashes = set()
+        chunks = self._filter_new_chunks(chunks)
+
         # Generate embeddings
         embeddings = self.embedding_model.embed_chunks(chunks)
 
         # Build vector store
         self.vector_store.build_index(chunks, embeddings)
 
+        # Build keyword index for lexical fallback
+        if self.config.keyword_fallback:
+            self.keyword_index.build([chunk.content for chunk in chunks])
+
+        self._clear_search_caches()
         logger.info(f"Index created successfully")
         return self.vector_store
 
-    def search(self, query: str, top_k: Optional[int] = None) -> List[Tuple[TextChunk, float]]:
+    def add_chunks(self, chunks: List[TextChunk]) -> int:
+        """
+        Add chunks to the existing index without rebuilding it.
+
+        Only chunks whose content has not been indexed yet are embedded,
+        so re-ingesting a known source costs no model inference.
+
+        Args:
+            chunks: List of TextChunk objects
+
+        Returns:
+            Number of chunks actually added
+        """
+        new_chunks = self._filter_new_chunks(chunks)
+        if not new_chunks:
+            logger.info("No new chunks to index")
+            return 0
+
+        embeddings = self.embedding_model.embed_chunks(new_chunks)
+        self.vector_store.add_to_index(new_chunks, embeddings)
+
+        # The BM25 weights depend on the whole corpus, so rebuild (cheap, no model)
+        if self.config.keyword_fallback:
+            self.keyword_index.build([chunk.content for chunk in self.vector_store.chunks])
+
+        self._clear_search_caches()
+        return len(new_chunks)
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a query once so it can be shared by search and the response cache.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Normalized query embedding
+        """
+        return self.embedding_model.embed_text(query)
+
+    def search(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> List[Tuple[TextChunk, float]]:
         """
         Search for relevant chunks given a query.
 
         Args:
             query: Search query
             top_k: Number of results to return
+            query_embedding: Precomputed embedding of the query (see embed_query)
 
         Returns:
             List of (TextChunk, score) tuples
@@ -254,36 +626,203 @@ class EmbeddingManager:
             return []
 
         top_k = top_k or self.config.top_k_results
+        threshold = self.config.similarity_threshold
+
+        # Exact repeats skip embedding and search entirely
+        key = (query, top_k, threshold)
+        results = self._exact_search_cache.get(key)
+        if results is None:
+            results = self._search_ids(query, top_k, threshold, query_embedding)
+            self._exact_search_cache.put(key, results)
+
+        # Convert to (chunk, score) tuples (result ids are always valid chunk indices)
+        chunks = self.vector_store.chunks
+        return [(chunks[idx], score) for idx, score in results]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        top_k: Optional[int] = None,
+        query_embeddings: Optional[np.ndarray] = None,
+    ) -> List[List[Tuple[TextChunk, float]]]:
+        """
+        Search for the chunks relevant to several queries at once.
+
+        The queries are embedded in one forward pass and looked up with one
+        index call, instead of one of each per query.
+
+        Args:
+            queries: Search queries
+            top_k: Number of results to return per query
+            query_embeddings: Precomputed query embeddings (one row per query)
+
+        Returns:
+            One list of (TextChunk, score) tuples per query
+        """
+        if not self.vector_store.is_built:
+            logger.error("Cannot search: index not built")
+            return [[] for _ in queries]
+
+        if not queries:
+            return []
+
+        top_k = top_k or self.config.top_k_results
+        threshold = self.config.similarity_threshold
+
+        # Exact repeats are answered before anything is embedded
+        keys = [(query, top_k, threshold) for query in queries]
+        results = [self._exact_search_cache.get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+
+        if misses:
+            miss_queries = [queries[i] for i in misses]
+            if query_embeddings is None:
+                miss_embeddings = self.embedding_model.embed_texts(miss_queries)
+            else:
+                miss_embeddings = query_embeddings[misses]
+
+            found = self._search_ids_batch(miss_queries, top_k, threshold, miss_embeddings)
+            for i, hits in zip(misses, found):
+                self._exact_search_cache.put(keys[i], hits)
+                results[i] = hits
+
+        chunks = self.vector_store.chunks
+        return [[(chunks[idx], score) for idx, score in hits] for hits in results]
+
+    def _search_ids(
+        self,
+        query: str,
+        top_k: int,
+        threshold: float,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> Tuple[Tuple[int, float], ...]:
+        """
+        Run an uncached search.
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            threshold: Minimum similarity score
+            query_embedding: Precomputed query embedding (embedded here if omitted)
 
+        Returns:
+            Tuple of (chunk_index, score) pairs
+        """
         # Generate query embedding
-        query_embedding = self.embedding_model.embed_text(query)
+        if query_embedding is None:
+            query_embedding = self.embedding_model.embed_text(query)
+
+        return self._search_ids_batch([query], top_k, threshold, query_embedding.reshape(1, -1))[0]
+
+    def _search_ids_batch(
+        self,
+        queries: List[str],
+        top_k: int,
+        threshold: float,
+        query_embeddings: np.ndarray,
+    ) -> List[Tuple[Tuple[int, float], ...]]:
+        """
+        Run uncached searches for several embedded queries.
+
+        Args:
+            queries: Search queries
+            top_k: Number of results to return per query
+            threshold: Minimum similarity score
+            query_embeddings: Query embeddings (one row per query)
+
+        Returns:
+            One tuple of (chunk_index, score) pairs per query
+        """
+        results: List[Optional[Tuple[Tuple[int, float], ...]]] = [None] * len(queries)
+
+        # A near-duplicate of an earlier query gets the same chunks without a search
+        cache_namespace = str(top_k)
+        if self.config.search_cache_enabled:
+            for i, query_embedding in enumerate(query_embeddings):
+                results[i] = self._search_cache.lookup(query_embedding, cache_namespace)
+
+        misses = [i for i, result in enumerate(results) if result is None]
+        if not misses:
+            return results
+
+        # Search every query the cache could not answer in one index call
+        found = self.vector_store.search_batch(query_embeddings[misses], top_k, threshold)
+
+        for i, hits in zip(misses, found):
+            # Fall back to keyword matches when no chunk clears the threshold
+            if not hits and self.keyword_index.is_built:
+                hits = self.keyword_index.search(queries[i], top_k)
+                logger.info(f"Keyword fallback found {len(hits)} chunks")
+
+            logger.info(f"Found {len(hits)} relevant chunks (threshold={threshold})")
+
+            results[i] = tuple(hits)
+            if self.config.search_cache_enabled:
+                self._search_cache.add(query_embeddings[i], results[i], cache_namespace)
+
+        return results
+
+    def _clear_search_caches(self):
+        """Forget cached search results after the index changes."""
+        self._exact_search_cache.clear()
+        self._search_cache.clear()
+
+    def index_cache_dir(self, chunks: List[TextChunk]) -> Path:
+        """
+        Get the persisted index directory for a set of chunks.
+
+        The directory name hashes the embedding model, the vector storage
+        settings and every chunk, so a change to the documents, the chunking
+        or the index type maps to a new index.
 
-        # Search
-        results = self.vector_store.search(query_embedding, top_k)
+        Args:
+            chunks: Chunks the index is built from
+
+        Returns:
+            Directory path (may not exist yet)
+        """
+        digest = hashlib.md5(self.embedding_model.model_name.encode("utf-8"))
+        digest.update(
+            f"\0v{INDEX_CACHE_VERSION}\0{self.config.use_hnsw}\0{self.config.vector_quantization}\0".encode("utf-8")
+        )
+        for chunk in chunks:
+            digest.update(f"{chunk.source}\0{chunk.page_numbers}\0{chunk.content}\0".encode("utf-8"))
+
+        return self.data_config.cache_path / "index" / digest.hexdigest()
 
-        # Convert to (chunk, score) tuples
-        chunk_results = []
-        for idx, score in results:
-            chunk = self.vector_store.get_chunk(idx)
-            if chunk and score >= self.config.similarity_threshold:
-                chunk_results.append((chunk, score))
+    def save_index(self, path: Optional[Path] = None):
+        """
+        Save the current index to disk.
+
+        Args:
+            path: Target directory (defaults to the configured cache directory)
+        """
+        if path is None:
+            self.vector_store.save(self.data_config.cache_path)
+            return
 
-        logger.info(f"Found {len(chunk_results)} relevant chunks (threshold={self.config.similarity_threshold})")
-        return chunk_results
+        # Write to a temp directory first so readers never see a partial index
+        path = Path(path)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
 
-    def save_index(self):
-        """Save the current index to disk."""
-        cache_dir = self.data_config.project_root / self.data_config.cache_dir
-        self.vector_store.save(cache_dir)
+        try:
+            self.vector_store.save(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to persist index to {path}: {e}")
+            shutil.rmtree(tmp_path, ignore_errors=True)
 
-    def load_index(self) -> bool:
+    def load_index(self, path: Optional[Path] = None) -> bool:
         """
         Load index from disk.
 
+        Args:
+            path: Directory to load from (defaults to the configured cache directory)
+
         Returns:
             True if successful, False otherwise
         """
-        cache_dir = self.data_config.project_root / self.data_config.cache_dir
+        cache_dir = Path(path) if path is not None else self.data_config.cache_path
         index_path = cache_dir / "index.faiss"
 
         if not index_path.exists():
@@ -292,7 +831,27 @@ class EmbeddingManager:
 
         try:
             self.vector_store.load(cache_dir)
-            return True
         except Exception as e:
             logger.error(f"Failed to load cached index: {e}")
             return False
+
+        chunks = self.vector_store.chunks
+        if not chunks or len(chunks) != self.vector_store.index.ntotal:
+            logger.warning(f"Cached index at {cache_dir} has no matching chunks, ignoring it")
+            self.vector_store = VectorStore(self.embedding_model.embedding_dim)
+            return False
+
+        self._chunk_hashes = set()
+        self._filter_new_chunks(chunks)
+        if self.config.keyword_fallback:
+            self.keyword_index.build([chunk.content for chunk in chunks])
+
+        self._clear_search_caches()
+        return True
+
+
+def clear_index_cache():
+    """Delete all persisted indexes so the next initialization rebuilds them."""
+    index_dir = get_data_source_config().cache_path / "index"
+    shutil.rmtree(index_dir, ignore_errors=True)
+    logger.info(f"Cleared index cache: {index_dir}")
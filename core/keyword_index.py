@@ -0,0 +1,139 @@
+"""
+Z.M.ai - Keyword Index
+
+Sparse BM25 index for lexical retrieval over text chunks.
+"""
+
+import re
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Function words that match almost every chunk and only add noise to scoring
+STOP_WORDS = frozenset("""
+    a about above after again against all am an and any are as at be because
+    been before being below between both but by can could did do does doing
+    down during each few for from further had has have having he her here hers
+    herself him himself his how i if in into is it its itself just me more most
+    my myself no nor not now of off on once only or other our ours ourselves out
+    over own same she should so some such than that the their theirs them
+    themselves then there these they this those through to too under until up
+    very was we were what when where which while who whom why will with would
+    you your yours yourself yourselves
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens, dropping stop words and single letters."""
+    return [
+        token for token in _TOKEN_RE.findall(text.lower())
+        if (len(token) > 1 or token.isdigit()) and token not in STOP_WORDS
+    ]
+
+
+class KeywordIndex:
+    """
+    BM25 keyword index backed by a SciPy sparse matrix.
+
+    The per-(chunk, term) BM25 weights are precomputed once per corpus and
+    stored column-major, so each column is the posting list of a term and
+    scoring a query only touches the postings of its terms.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty keyword index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization strength
+        """
+        self.k1 = k1
+        self.b = b
+        self.vocabulary: Dict[str, int] = {}
+        self.idf: Optional[np.ndarray] = None
+        self.matrix: Optional[sparse.csc_matrix] = None
+        self.is_built = False
+
+    def build(self, texts: List[str]):
+        """
+        Build the BM25 weight matrix from texts.
+
+        Args:
+            texts: Chunk texts, in the same order as the vector store
+        """
+        self.vocabulary = {}
+        rows, cols, counts = [], [], []
+        doc_lengths = np.zeros(len(texts), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[row] = len(tokens)
+            for term, count in Counter(tokens).items():
+                rows.append(row)
+                cols.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                counts.append(count)
+
+        n_docs, n_terms = len(texts), len(self.vocabulary)
+        if n_docs == 0 or n_terms == 0:
+            logger.warning("No terms to build keyword index from")
+            return
+
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        tf = np.asarray(counts, dtype=np.float32)
+
+        df = np.bincount(cols, minlength=n_terms)
+        self.idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        length_norm = 1 - self.b + self.b * doc_lengths / doc_lengths.mean()
+        weights = self.idf[cols] * tf * (self.k1 + 1) / (tf + self.k1 * length_norm[rows])
+
+        self.matrix = sparse.csc_matrix(
+            (weights.astype(np.float32), (rows, cols)),
+            shape=(n_docs, n_terms),
+        )
+
+        self.is_built = True
+        logger.info(f"Built keyword index: {n_docs} chunks, {n_terms} terms")
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Search for chunks sharing terms with the query.
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+
+        Returns:
+            List of (chunk_index, BM25 score) tuples, best first
+        """
+        if not self.is_built:
+            return []
+
+        counts = Counter(
+            self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary
+        )
+        if not counts:
+            return []
+
+        # Sum the posting lists of the query terms only
+        cols = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        query_tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        scores = self.matrix[:, cols] @ query_tf
+
+        # O(N) partial selection, then order only the top-k
+        k = min(top_k, scores.shape[0])
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [(int(idx), float(scores[idx])) for idx in top if scores[idx] > 0]
@@ -4,19 +4,158 @@ Z.M.ai - LLM Handler Module
 Handles integration with Groq API for LLM responses.
 """
 
+import asyncio
+import importlib.util
 import logging
-from typing import Optional, List, Dict, Any, Iterator
-from dataclasses import dataclass, field
-import json
+from typing import Optional, List, Dict, Any, AsyncIterator, Awaitable, Iterator, Tuple, TypeVar
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+import hashlib
 
-import requests
-from groq import Groq
+import httpx
+import numpy as np
+from groq import Groq, AsyncGroq, DefaultHttpxClient, DefaultAsyncHttpxClient
 
-from config import get_groq_config, get_ui_config
+from config import get_groq_config, get_rag_config, get_ui_config
+from .embeddings import EmbeddingModel
 from .retriever import RetrievalResult
+from .response_cache import SemanticResponseCache
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# httpx speaks HTTP/2 only when the optional h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Provider prompt caches match on identical leading tokens, so every request
+# starts with the same static text (system prompt, then the RAG instructions)
+# and only then the per-query context and question: static first, dynamic last.
+SYSTEM_PROMPT = """You are Z.M.ai, a helpful academic policy assistant for university students.
+
+YOUR ROLE:
+- Help students understand academic policies clearly
+- Provide accurate information based ONLY on the provided context
+- Be friendly, clear, and concise
+
+IMPORTANT RULES:
+1. NEVER make up information that isn't in the context
+2. If you don't know something based on the context, say so clearly
+3. Keep answers relevant to academic policies
+4. Use bullet points or numbered lists for clarity
+5. Be concise but thorough
+
+RESPONSE STYLE:
+- Start with a direct answer
+- Use markdown formatting for readability
+- Include relevant details from the context
+- End with a helpful follow-up if appropriate"""
+
+# Used when no documents are loaded at all
+GENERAL_SYSTEM_PROMPT = """You are Z.M.ai, an academic policy assistant. You don't have access to specific documents right now, but you can provide general guidance about university policies.
+
+Be helpful but clarify that for specific questions, the user should refer to the official policy documents."""
+
+RAG_INSTRUCTIONS = (
+    "Provide a helpful answer based ONLY on the context below. "
+    "If the answer isn't in the context, say that you don't have enough information."
+)
+
+_RAG_TEMPLATE = RAG_INSTRUCTIONS + """
+
+CONTEXT FROM ACADEMIC POLICY DOCUMENTS:
+{context}
+
+QUESTION:
+{query}"""
+
+# Sent without calling the model when retrieval found nothing
+NO_CONTEXT_ANSWER = (
+    "I don't have enough information about this topic in the policy documents. "
+    "Try rephrasing your question or asking about a specific academic policy."
+)
+
+_NO_CONTEXT_TEMPLATE = """Based on the available policy documents, I cannot find information to answer this question.
+
+Question: {query}
+
+Please respond that you don't have enough information about this topic in the policy documents."""
+
+
+def _connection_limits() -> httpx.Limits:
+    """Connection pool limits for the Groq HTTP clients."""
+    pool_size = get_groq_config().pool_size
+    return httpx.Limits(
+        max_keepalive_connections=pool_size,
+        max_connections=pool_size * 2,
+        keepalive_expiry=60,
+    )
+
+
+def _batched_deltas(deltas: Iterator[str], min_size: int, growth: float, cap: int) -> Iterator[str]:
+    """
+    Regroup streamed deltas into progressively larger chunks.
+
+    The first chunk holds ``min_size`` deltas so the answer still starts
+    appearing immediately; each later chunk is ``growth`` times larger, up to
+    ``cap`` deltas, which keeps the number of UI updates per answer small.
+
+    Args:
+        deltas: Streamed text deltas
+        min_size: Deltas in the first chunk
+        growth: Growth factor of the chunk size
+        cap: Maximum deltas per chunk
+
+    Yields:
+        Joined chunks of deltas
+    """
+    size = min_size
+    buffer = []
+    for delta in deltas:
+        buffer.append(delta)
+        if len(buffer) >= size:
+            yield "".join(buffer)
+            buffer.clear()
+            size = min(cap, max(size, int(size * growth)))
+
+    if buffer:
+        yield "".join(buffer)
+
+
+async def _abatched_deltas(
+    deltas: AsyncIterator[str], min_size: int, growth: float, cap: int
+) -> AsyncIterator[str]:
+    """Async counterpart of _batched_deltas."""
+    size = min_size
+    buffer = []
+    async for delta in deltas:
+        buffer.append(delta)
+        if len(buffer) >= size:
+            yield "".join(buffer)
+            buffer.clear()
+            size = min(cap, max(size, int(size * growth)))
+
+    if buffer:
+        yield "".join(buffer)
+
+
+@lru_cache(maxsize=4)
+def get_groq_client(api_key: str) -> Groq:
+    """
+    Get a shared Groq client for the given API key.
+
+    Streamlit re-executes the script on every interaction, which rebuilds
+    GroqHandler each time. Sharing the client keeps its connection pool (and
+    the TLS sessions in it) alive across reruns and sessions, sized by
+    GROQ_POOL_SIZE. With HTTP/2, concurrent requests from all sessions
+    multiplex over one connection.
+    """
+    return Groq(
+        api_key=api_key,
+        max_retries=get_groq_config().max_retries,
+        http_client=DefaultHttpxClient(http2=HTTP2_AVAILABLE, limits=_connection_limits()),
+    )
+
 
 @dataclass
 class LLMResponse:
@@ -55,7 +194,39 @@ class GroqHandler:
         if not self.config.api_key:
             logger.warning("GROQ_API_KEY not configured")
 
-        self.client = Groq(api_key=self.config.api_key) if self.config.api_key else None
+        self.client = get_groq_client(self.config.api_key) if self.config.api_key else None
+
+        # Fail fast on connect; allow the configured budget for generation
+        self.timeout = httpx.Timeout(self.config.timeout, connect=self.config.connect_timeout)
+
+        # Async client is created lazily per event loop (see _get_async_client)
+        self._async_client: Optional[AsyncGroq] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _build_messages(self, prompt: str, system_prompt: Optional[str] = None) -> List[Dict[str, str]]:
+        """Build the chat messages payload."""
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def _to_llm_response(self, response) -> LLMResponse:
+        """Convert a Groq chat completion into an LLMResponse."""
+        content = response.choices[0].message.content
+        tokens_used = response.usage.total_tokens if response.usage else 0
+
+        logger.info("Groq response received: %d chars, %s tokens", len(content), tokens_used)
+
+        return LLMResponse(
+            content=content,
+            model_used=self.config.model_name,
+            tokens_used=tokens_used,
+            raw_response={
+                "model": response.model,
+                "usage": response.usage.model_dump() if response.usage else {},
+            },
+        )
 
     def generate_response(
         self,
@@ -86,13 +257,9 @@ class GroqHandler:
         temperature = temperature or self.config.temperature
         max_tokens = max_tokens or self.config.max_tokens
 
-        # Build messages
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
+        messages = self._build_messages(prompt, system_prompt)
 
-        logger.debug(f"Sending request to Groq: model={self.config.model_name}, tokens={max_tokens}")
+        logger.debug("Sending request to Groq: model=%s, tokens=%s", self.config.model_name, max_tokens)
 
         try:
             response = self.client.chat.completions.create(
@@ -100,29 +267,137 @@ class GroqHandler:
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
-                timeout=self.config.timeout,
+                timeout=self.timeout,
             )
 
-            # Extract response
-            content = response.choices[0].message.content
-            tokens_used = response.usage.total_tokens if response.usage else 0
+            return self._to_llm_response(response)
+
+        except Exception as e:
+            logger.error("Groq API error: %s", e)
+            raise RuntimeError(f"Failed to generate response: {e}")
 
-            logger.info(f"Groq response received: {len(content)} chars, {tokens_used} tokens")
+    def _get_async_client(self) -> AsyncGroq:
+        """
+        Get an async Groq client bound to the running event loop.
 
-            return LLMResponse(
-                content=content,
-                model_used=self.config.model_name,
-                tokens_used=tokens_used,
-                raw_response={
-                    "model": response.model,
-                    "usage": response.usage.model_dump() if response.usage else {},
-                },
+        httpx connection pools cannot be shared across event loops, so a new
+        client is created whenever the handler is driven from a different loop
+        (e.g. successive ``asyncio.run`` calls from Streamlit reruns).
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = AsyncGroq(
+                api_key=self.config.api_key,
+                max_retries=self.config.max_retries,
+                http_client=DefaultAsyncHttpxClient(http2=HTTP2_AVAILABLE, limits=_connection_limits()),
             )
+            self._async_loop = loop
+        return self._async_client
+
+    async def aclose(self):
+        """Close the async client's connection pool if it belongs to the running loop."""
+        if self._async_client is not None and self._async_loop is asyncio.get_running_loop():
+            client = self._async_client
+            self._async_client = None
+            self._async_loop = None
+            await client.close()
+
+    def run_sync(self, coro: Awaitable[T]) -> T:
+        """
+        Run a coroutine on a new event loop from synchronous code.
+
+        The async client created for that loop is closed before the loop
+        ends, so its keep-alive connections are not left open on a dead
+        loop. Callers that own a long-lived loop keep the cached client.
+
+        Args:
+            coro: Coroutine using this handler's async methods
+
+        Returns:
+            The coroutine's result
+        """
+        async def _run() -> T:
+            try:
+                return await coro
+            finally:
+                await self.aclose()
+
+        return asyncio.run(_run())
+
+    async def agenerate_response(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> LLMResponse:
+        """
+        Generate a response from Groq without blocking the event loop.
+
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+
+        Returns:
+            LLMResponse object
+
+        Raises:
+            ValueError: If API key is not configured
+            RuntimeError: If API call fails
+        """
+        if not self.client:
+            raise ValueError("Groq API key not configured. Please set GROQ_API_KEY.")
+
+        temperature = temperature or self.config.temperature
+        max_tokens = max_tokens or self.config.max_tokens
+
+        messages = self._build_messages(prompt, system_prompt)
+
+        logger.debug("Sending async request to Groq: model=%s, tokens=%s", self.config.model_name, max_tokens)
+
+        try:
+            response = await self._get_async_client().chat.completions.create(
+                model=self.config.model_name,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=self.timeout,
+            )
+
+            return self._to_llm_response(response)
 
         except Exception as e:
-            logger.error(f"Groq API error: {e}")
+            logger.error("Groq API error: %s", e)
             raise RuntimeError(f"Failed to generate response: {e}")
 
+    def generate_responses(
+        self,
+        prompts: List[str],
+        system_prompt: Optional[str] = None,
+    ) -> List[LLMResponse]:
+        """
+        Generate responses for several prompts concurrently.
+
+        The requests are issued together with ``asyncio.gather``, so the total
+        latency is roughly that of the slowest request instead of the sum.
+
+        Args:
+            prompts: User prompts
+            system_prompt: Optional system prompt shared by all prompts
+
+        Returns:
+            List of LLMResponse objects, in the same order as prompts
+        """
+        async def _gather() -> List[LLMResponse]:
+            return await asyncio.gather(*(
+                self.agenerate_response(prompt=prompt, system_prompt=system_prompt)
+                for prompt in prompts
+            ))
+
+        return self.run_sync(_gather())
+
     def stream_response(
         self,
         prompt: str,
@@ -148,13 +423,9 @@ class GroqHandler:
 
         temperature = temperature or self.config.temperature
 
-        # Build messages
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
+        messages = self._build_messages(prompt, system_prompt)
 
-        logger.debug(f"Starting stream: model={self.config.model_name}")
+        logger.debug("Starting stream: model=%s", self.config.model_name)
 
         try:
             stream = self.client.chat.completions.create(
@@ -162,7 +433,7 @@ class GroqHandler:
                 messages=messages,
                 temperature=temperature,
                 stream=True,
-                timeout=self.config.timeout,
+                timeout=self.timeout,
             )
 
             for chunk in stream:
@@ -170,7 +441,56 @@ class GroqHandler:
                     yield delta
 
         except Exception as e:
-            logger.error(f"Groq streaming error: {e}")
+            logger.error("Groq streaming error: %s", e)
+            raise RuntimeError(f"Failed to stream response: {e}")
+
+    async def astream_response(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response from Groq without blocking the event loop.
+
+        One event loop can multiplex many concurrent streams over the pooled
+        async client instead of tying up a thread per stream.
+
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature
+
+        Yields:
+            Chunks of response text as they arrive
+
+        Raises:
+            ValueError: If API key is not configured
+        """
+        if not self.client:
+            raise ValueError("Groq API key not configured. Please set GROQ_API_KEY.")
+
+        temperature = temperature or self.config.temperature
+
+        messages = self._build_messages(prompt, system_prompt)
+
+        logger.debug("Starting async stream: model=%s", self.config.model_name)
+
+        try:
+            stream = await self._get_async_client().chat.completions.create(
+                model=self.config.model_name,
+                messages=messages,
+                temperature=temperature,
+                stream=True,
+                timeout=self.timeout,
+            )
+
+            async for chunk in stream:
+                if delta := chunk.choices[0].delta.content:
+                    yield delta
+
+        except Exception as e:
+            logger.error("Groq streaming error: %s", e)
             raise RuntimeError(f"Failed to stream response: {e}")
 
 
@@ -179,16 +499,37 @@ class RAGLLMHandler:
     High-level handler that combines RAG retrieval with LLM generation.
     """
 
-    def __init__(self):
-        """Initialize the RAG-LLM handler."""
+    def __init__(self, embedding_model: Optional[EmbeddingModel] = None):
+        """
+        Initialize the RAG-LLM handler.
+
+        Args:
+            embedding_model: Optional embedding model used for the semantic
+                response cache (a new one is loaded if the cache is enabled
+                and none is given)
+        """
         self.groq = GroqHandler()
+        self.rag_config = get_rag_config()
+        self.ui_config = get_ui_config()
         self.default_system_prompt = self._get_system_prompt()
 
+        self.embedding_model = embedding_model
+        self.response_cache: Optional[SemanticResponseCache] = None
+        if self.rag_config.response_cache_enabled:
+            self.embedding_model = embedding_model or EmbeddingModel()
+            self.response_cache = SemanticResponseCache(self.embedding_model.embedding_dim)
+
+    @staticmethod
+    def _cache_namespace(system_prompt: str) -> str:
+        """Get the response cache namespace for a system prompt."""
+        return hashlib.sha1(system_prompt.encode("utf-8")).hexdigest()
+
     def answer_question(
         self,
         query: str,
         retrieval_result: RetrievalResult,
         custom_system_prompt: Optional[str] = None,
+        query_embedding: Optional[np.ndarray] = None,
     ) -> LLMResponse:
         """
         Answer a question using retrieved context.
@@ -197,23 +538,25 @@ class RAGLLMHandler:
             query: User question
             retrieval_result: Result from RAG retrieval
             custom_system_prompt: Optional custom system prompt
+            query_embedding: Precomputed embedding of the question (reused for the cache lookup)
 
         Returns:
             LLMResponse with answer and sources
         """
-        # Build prompt with context
-        system_prompt = custom_system_prompt or self.default_system_prompt
+        # Nothing retrieved: the model could only refuse, so skip the round trip
+        if self._skip_llm(retrieval_result):
+            return LLMResponse(content=NO_CONTEXT_ANSWER)
 
-        if retrieval_result.has_context:
-            context = retrieval_result.context_text
-            prompt = self._build_rag_prompt(query, context)
-        else:
-            # No context found
-            prompt = f"""Based on the available policy documents, I cannot find information to answer this question.
+        system_prompt, prompt = self._prepare_prompt(query, retrieval_result, custom_system_prompt)
 
-Question: {query}
+        # Answer near-duplicate questions from the semantic cache
+        if self.response_cache is not None:
+            if query_embedding is None:
+                query_embedding = self.embedding_model.embed_text(query)
+            namespace = self._cache_namespace(system_prompt)
 
-Please respond that you don't have enough information about this topic in the policy documents."""
+            if cached := self.response_cache.lookup(query_embedding, namespace):
+                return replace(cached, sources=list(cached.sources))
 
         # Generate response
         response = self.groq.generate_response(
@@ -224,6 +567,9 @@ Please respond that you don't have enough information about this topic in the po
         # Add sources
         response.sources = retrieval_result.get_sources_with_pages()
 
+        if self.response_cache is not None:
+            self.response_cache.add(query_embedding, response, namespace)
+
         return response
 
     def stream_answer(
@@ -231,6 +577,7 @@ Please respond that you don't have enough information about this topic in the po
         query: str,
         retrieval_result: RetrievalResult,
         custom_system_prompt: Optional[str] = None,
+        query_embedding: Optional[np.ndarray] = None,
     ) -> Iterator[str]:
         """
         Stream an answer to a question.
@@ -239,58 +586,210 @@ Please respond that you don't have enough information about this topic in the po
             query: User question
             retrieval_result: Result from RAG retrieval
             custom_system_prompt: Optional custom system prompt
+            query_embedding: Precomputed embedding of the question (reused for the cache lookup)
 
         Yields:
             Response chunks as they arrive
         """
-        system_prompt = custom_system_prompt or self.default_system_prompt
+        if self._skip_llm(retrieval_result):
+            yield NO_CONTEXT_ANSWER
+            return
+
+        system_prompt, prompt = self._prepare_prompt(query, retrieval_result, custom_system_prompt)
+
+        # A cached answer is emitted as a single chunk
+        if self.response_cache is not None:
+            if query_embedding is None:
+                query_embedding = self.embedding_model.embed_text(query)
+            namespace = self._cache_namespace(system_prompt)
+
+            if cached := self.response_cache.lookup(query_embedding, namespace):
+                yield cached.content
+                return
+
+        parts = []
+        deltas = self.groq.stream_response(prompt=prompt, system_prompt=system_prompt)
+        for text in _batched_deltas(deltas, *self._stream_batching()):
+            parts.append(text)
+            yield text
+
+        if self.response_cache is not None:
+            self.response_cache.add(
+                query_embedding,
+                LLMResponse(
+                    content="".join(parts),
+                    sources=retrieval_result.get_sources_with_pages(),
+                    model_used=self.groq.config.model_name,
+                ),
+                namespace,
+            )
 
-        if retrieval_result.has_context:
-            context = retrieval_result.context_text
-            prompt = self._build_rag_prompt(query, context)
-        else:
-            prompt = f"""Based on the available policy documents, I cannot find information to answer this question.
+    async def astream_answer(
+        self,
+        query: str,
+        retrieval_result: RetrievalResult,
+        custom_system_prompt: Optional[str] = None,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream an answer to a question from async code.
 
-Question: {query}
+        Args:
+            query: User question
+            retrieval_result: Result from RAG retrieval
+            custom_system_prompt: Optional custom system prompt
+            query_embedding: Precomputed embedding of the question (reused for the cache lookup)
 
-Please respond that you don't have enough information about this topic in the policy documents."""
+        Yields:
+            Response chunks as they arrive
+        """
+        if self._skip_llm(retrieval_result):
+            yield NO_CONTEXT_ANSWER
+            return
+
+        system_prompt, prompt = self._prepare_prompt(query, retrieval_result, custom_system_prompt)
+
+        # A cached answer is emitted as a single chunk
+        if self.response_cache is not None:
+            if query_embedding is None:
+                # Encoding is CPU-bound; keep it off the event loop
+                query_embedding = await asyncio.to_thread(self.embedding_model.embed_text, query)
+            namespace = self._cache_namespace(system_prompt)
+
+            if cached := self.response_cache.lookup(query_embedding, namespace):
+                yield cached.content
+                return
+
+        parts = []
+        deltas = self.groq.astream_response(prompt=prompt, system_prompt=system_prompt)
+        async for text in _abatched_deltas(deltas, *self._stream_batching()):
+            parts.append(text)
+            yield text
+
+        if self.response_cache is not None:
+            self.response_cache.add(
+                query_embedding,
+                LLMResponse(
+                    content="".join(parts),
+                    sources=retrieval_result.get_sources_with_pages(),
+                    model_used=self.groq.config.model_name,
+                ),
+                namespace,
+            )
 
-        yield from self.groq.stream_response(
-            prompt=prompt,
-            system_prompt=system_prompt,
+    async def answer_batch(
+        self,
+        items: List[Tuple[str, RetrievalResult]],
+        custom_system_prompt: Optional[str] = None,
+    ) -> List[LLMResponse]:
+        """
+        Answer several independent questions concurrently.
+
+        No more requests are in flight at once than the connection pool can
+        hold, so extra questions wait for a free connection instead of failing.
+
+        Args:
+            items: (question, retrieval result) pairs
+            custom_system_prompt: Optional custom system prompt shared by all questions
+
+        Returns:
+            List of LLMResponse objects, in the same order as items
+        """
+        in_flight = asyncio.Semaphore(_connection_limits().max_connections)
+
+        async def _answer(query: str, retrieval_result: RetrievalResult) -> LLMResponse:
+            if self._skip_llm(retrieval_result):
+                return LLMResponse(content=NO_CONTEXT_ANSWER)
+
+            system_prompt, prompt = self._prepare_prompt(query, retrieval_result, custom_system_prompt)
+
+            if self.response_cache is not None:
+                query_embedding = await asyncio.to_thread(self.embedding_model.embed_text, query)
+                namespace = self._cache_namespace(system_prompt)
+
+                if cached := self.response_cache.lookup(query_embedding, namespace):
+                    return replace(cached, sources=list(cached.sources))
+
+            async with in_flight:
+                response = await self.groq.agenerate_response(prompt=prompt, system_prompt=system_prompt)
+
+            response.sources = retrieval_result.get_sources_with_pages()
+
+            if self.response_cache is not None:
+                self.response_cache.add(query_embedding, response, namespace)
+
+            return response
+
+        return await asyncio.gather(*(_answer(query, result) for query, result in items))
+
+    def answer_batch_sync(
+        self,
+        items: List[Tuple[str, RetrievalResult]],
+        custom_system_prompt: Optional[str] = None,
+    ) -> List[LLMResponse]:
+        """
+        Answer several independent questions concurrently from synchronous code.
+
+        Args:
+            items: (question, retrieval result) pairs
+            custom_system_prompt: Optional custom system prompt shared by all questions
+
+        Returns:
+            List of LLMResponse objects, in the same order as items
+        """
+        return self.groq.run_sync(self.answer_batch(items, custom_system_prompt))
+
+    def _skip_llm(self, retrieval_result: RetrievalResult) -> bool:
+        """Check whether to send the canned no-context answer instead of calling Groq."""
+        return self.rag_config.skip_llm_without_context and not retrieval_result.has_context
+
+    def _stream_batching(self) -> Tuple[int, float, int]:
+        """Get the (min_size, growth, cap) settings for batching streamed deltas."""
+        return (
+            self.ui_config.stream_batch_min,
+            self.ui_config.stream_batch_growth,
+            self.ui_config.stream_batch_cap,
         )
 
-    def _build_rag_prompt(self, query: str, context: str) -> str:
-        """Build RAG prompt with context and query."""
-        return f"""CONTEXT FROM ACADEMIC POLICY DOCUMENTS:
-{context}
+    def _prepare_prompt(
+        self,
+        query: str,
+        retrieval_result: RetrievalResult,
+        custom_system_prompt: Optional[str] = None,
+    ) -> Tuple[str, str]:
+        """
+        Build the system and user prompts shared by every answer path.
 
-QUESTION:
-{query}
+        Keeping a single code path means streaming and non-streaming requests
+        send byte-identical prompt prefixes, which provider prompt caches need.
+
+        Args:
+            query: User question
+            retrieval_result: Result from RAG retrieval
+            custom_system_prompt: Optional custom system prompt
 
-Provide a helpful answer based ONLY on the context above. If the answer isn't in the context, say that you don't have enough information."""
+        Returns:
+            Tuple of (system_prompt, user_prompt)
+        """
+        system_prompt = custom_system_prompt or self.default_system_prompt
+        return system_prompt, self._build_prompt(query, retrieval_result)
 
-    def _get_system_prompt(self) -> str:
-        """Get the default system prompt for Z.M.ai."""
-        return """You are Z.M.ai, a helpful academic policy assistant for university students.
+    def _build_prompt(self, query: str, retrieval_result: RetrievalResult) -> str:
+        """Build the user prompt, with the retrieved context or a no-context notice."""
+        if retrieval_result.has_context:
+            # Capped to the prompt token budget, so oversized retrievals do
+            # not inflate the prefill Groq bills for
+            return self._build_rag_prompt(query, retrieval_result.prompt_context)
 
-YOUR ROLE:
-- Help students understand academic policies clearly
-- Provide accurate information based ONLY on the provided context
-- Be friendly, clear, and concise
+        return _NO_CONTEXT_TEMPLATE.format_map({"query": query})
 
-IMPORTANT RULES:
-1. NEVER make up information that isn't in the context
-2. If you don't know something based on the context, say so clearly
-3. Keep answers relevant to academic policies
-4. Use bullet points or numbered lists for clarity
-5. Be concise but thorough
+    def _build_rag_prompt(self, query: str, context: str) -> str:
+        """Build RAG prompt with context and query (static instructions first)."""
+        return _RAG_TEMPLATE.format_map({"context": context, "query": query})
 
-RESPONSE STYLE:
-- Start with a direct answer
-- Use markdown formatting for readability
-- Include relevant details from the context
-- End with a helpful follow-up if appropriate"""
+    def _get_system_prompt(self) -> str:
+        """Get the default system prompt for Z.M.ai."""
+        return SYSTEM_PROMPT
 
     def answer_without_context(self, query: str) -> LLMResponse:
         """
@@ -302,13 +801,9 @@ RESPONSE STYLE:
         Returns:
             LLMResponse
         """
-        system_prompt = """You are Z.M.ai, an academic policy assistant. You don't have access to specific documents right now, but you can provide general guidance about university policies.
-
-Be helpful but clarify that for specific questions, the user should refer to the official policy documents."""
-
         response = self.groq.generate_response(
             prompt=query,
-            system_prompt=system_prompt,
+            system_prompt=GENERAL_SYSTEM_PROMPT,
         )
 
         return response
@@ -324,11 +819,8 @@ def format_response_with_sources(response: LLMResponse) -> str:
     Returns:
         Formatted markdown string
     """
-    output = response.content
-
-    if response.has_sources:
-        output += "\n\n---\n\n**Sources:**\n"
-        for source in response.sources:
-            output += f"- {source}\n"
+    if not response.has_sources:
+        return response.content
 
-    return output
+    source_lines = "".join(f"- {source}\n" for source in response.sources)
+    return f"{response.content}\n\n---\n\n**Sources:**\n{source_lines}"
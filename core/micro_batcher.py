@@ -0,0 +1,127 @@
+"""
+Z.M.ai - Micro-Batcher
+
+Background worker that coalesces concurrent requests into batches.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Base class for running concurrent single-item requests as batches.
+
+    Streamlit serves every session from its own thread. Items submitted
+    within max_wait seconds of each other (up to max_batch) are handed to
+    _process_batch together by a worker thread, and each caller gets its
+    own result through a Future.
+
+    The worker starts on the first request. With an idle_timeout it exits
+    after that many seconds without one, so a batcher that is no longer
+    used does not keep its resources alive; None keeps it running.
+    """
+
+    def __init__(
+        self,
+        max_batch: int,
+        max_wait: float,
+        idle_timeout: Optional[float] = None,
+        name: str = "micro-batcher",
+    ):
+        """
+        Create the batcher (the worker thread starts on demand).
+
+        Args:
+            max_batch: Maximum items per batch
+            max_wait: Seconds to wait for more items after the first one arrives
+            idle_timeout: Seconds without requests before the worker exits (None: never)
+            name: Worker thread name
+        """
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.idle_timeout = idle_timeout
+        self.name = name
+
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _process_batch(self, items: List[Any]) -> List[Any]:
+        """
+        Compute the results of one batch.
+
+        Args:
+            items: Submitted items, in arrival order
+
+        Returns:
+            One result per item, in the same order
+        """
+        raise NotImplementedError
+
+    def _submit(self, item: Any) -> Future:
+        """
+        Queue an item, starting the worker if it is not running.
+
+        Args:
+            item: Item to process
+
+        Returns:
+            Future resolving to the item's result
+        """
+        future: Future = Future()
+        with self._lock:
+            self._queue.put((item, future))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return future
+
+    def _next_batch(self) -> Optional[List[Tuple[Any, Future]]]:
+        """Wait for the first request, then gather more until the window closes."""
+        try:
+            batch = [self._queue.get(timeout=self.idle_timeout)]
+        except queue.Empty:
+            return None
+
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        """Process batches until the batcher has been idle for idle_timeout."""
+        while True:
+            batch = self._next_batch()
+
+            if batch is None:
+                with self._lock:
+                    # A request may have arrived just after the timeout
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+
+            logger.debug(f"{self.name}: processing a batch of {len(batch)}")
+
+            try:
+                results = self._process_batch([item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
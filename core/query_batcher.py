@@ -0,0 +1,98 @@
+"""
+Z.M.ai - Query Batcher
+
+Coalesces retrieval requests from concurrent sessions into batched searches.
+"""
+
+import logging
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .micro_batcher import MicroBatcher
+from .retriever import RAGPipeline, RetrievalResult
+
+logger = logging.getLogger(__name__)
+
+# (query, query embedding or None)
+_Request = Tuple[str, Optional[np.ndarray]]
+
+
+class QueryBatcher(MicroBatcher):
+    """
+    Runs concurrent retrieval requests against a pipeline as batches.
+
+    Streamlit serves every session from its own thread. Questions that
+    arrive within max_wait seconds of each other (up to max_batch) are
+    answered by one RAGPipeline.query_batch call: one forward pass for any
+    missing embeddings and one index search for the whole batch. Questions
+    already in the pipeline's retrieval cache are answered without queueing.
+
+    The worker thread starts on the first request and exits after
+    idle_timeout seconds without one, so a batcher whose pipeline has been
+    replaced does not keep it alive.
+    """
+
+    def __init__(
+        self,
+        pipeline: RAGPipeline,
+        max_batch: int = 16,
+        max_wait: float = 0.005,
+        idle_timeout: float = 30.0,
+    ):
+        """
+        Create the batcher (the worker thread starts on demand).
+
+        Args:
+            pipeline: Initialized pipeline to query
+            max_batch: Maximum questions per batch
+            max_wait: Seconds to wait for more questions after the first one arrives
+            idle_timeout: Seconds without requests before the worker exits
+        """
+        super().__init__(max_batch, max_wait, idle_timeout=idle_timeout, name="query-batcher")
+        self.pipeline = pipeline
+
+    def submit(self, query: str, query_embedding: Optional[np.ndarray] = None) -> "Future[RetrievalResult]":
+        """
+        Queue a question for retrieval.
+
+        Args:
+            query: User's question
+            query_embedding: Precomputed question embedding
+
+        Returns:
+            Future resolving to the question's RetrievalResult
+        """
+        # Exact repeats resolve immediately instead of waiting for a batch
+        if (cached := self.pipeline.cached_query(query)) is not None:
+            future: Future = Future()
+            future.set_result(cached)
+            return future
+
+        return self._submit((query, query_embedding))
+
+    def query(self, query: str, query_embedding: Optional[np.ndarray] = None) -> RetrievalResult:
+        """
+        Retrieve context for a question, blocking until its batch has run.
+
+        Args:
+            query: User's question
+            query_embedding: Precomputed question embedding
+
+        Returns:
+            RetrievalResult with relevant context
+        """
+        return self.submit(query, query_embedding).result()
+
+    def _process_batch(self, requests: List[_Request]) -> List[RetrievalResult]:
+        """Retrieve context for one batch of questions."""
+        queries = [query for query, _ in requests]
+        embeddings = [embedding for _, embedding in requests]
+
+        # Reuse the callers' embeddings only if every question has one
+        query_embeddings = None
+        if all(embedding is not None for embedding in embeddings):
+            query_embeddings = np.vstack(embeddings)
+
+        return self.pipeline.query_batch(queries, query_embeddings=query_embeddings)
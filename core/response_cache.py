@@ -0,0 +1,216 @@
+"""
+Z.M.ai - Response Cache
+
+Semantic cache that lets near-duplicate questions skip the LLM round-trip,
+and the exact-key LRU used in front of retrieval.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+import faiss
+
+from config import get_rag_config
+
+logger = logging.getLogger(__name__)
+
+
+class ExactCache:
+    """
+    Thread-safe LRU cache keyed by exact value (e.g. the question text).
+
+    Unlike functools.lru_cache, a lookup never computes the value, so callers
+    can check for a hit before doing expensive work such as embedding.
+    """
+
+    def __init__(self, max_entries: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries (0 disables caching)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get the cached value for a key, marking it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+class SemanticResponseCache:
+    """
+    Cache of LLM responses keyed by query embedding.
+
+    A lookup returns the stored response of the most similar previous query
+    when its cosine similarity reaches the threshold. Entries are grouped by
+    namespace (e.g. a hash of the system prompt) so that answers produced
+    under different instructions never mix. Once more than max_entries are
+    stored, the least recently used quarter is evicted.
+    """
+
+    def __init__(
+        self,
+        embedding_dim: int,
+        threshold: Optional[float] = None,
+        name: str = "Response",
+        max_entries: Optional[int] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            embedding_dim: Dimension of query embedding vectors
+            threshold: Minimum cosine similarity for a cache hit
+            name: Label used in log messages
+            max_entries: Maximum number of cached responses across namespaces
+        """
+        self.config = get_rag_config()
+        self.name = name
+        self.embedding_dim = embedding_dim
+        self.threshold = threshold if threshold is not None else self.config.response_cache_threshold
+        self.max_entries = max_entries if max_entries is not None else self.config.response_cache_size
+
+        self._indexes: Dict[str, faiss.Index] = {}
+        self._values: Dict[str, List[Any]] = {}
+        # Logical clock of each entry's last use, parallel to _values
+        self._last_used: Dict[str, List[int]] = {}
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(values) for values in self._values.values())
+
+    def _prepare(self, embedding: np.ndarray) -> np.ndarray:
+        """Return a normalized float32 copy of the embedding as a (1, dim) matrix."""
+        vector = np.array(embedding, dtype="float32").reshape(1, -1)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def lookup(self, query_embedding: np.ndarray, namespace: str = "") -> Optional[Any]:
+        """
+        Find a cached response for a query.
+
+        Args:
+            query_embedding: Embedding of the incoming query
+            namespace: Cache namespace to search in
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            index = self._indexes.get(namespace)
+            if index is None or index.ntotal == 0:
+                return None
+
+            scores, indices = index.search(self._prepare(query_embedding), 1)
+
+            score, idx = float(scores[0][0]), int(indices[0][0])
+            if idx < 0 or score < self.threshold:
+                return None
+
+            self._clock += 1
+            self._last_used[namespace][idx] = self._clock
+            value = self._values[namespace][idx]
+
+        logger.info(f"{self.name} cache hit (similarity={score:.3f})")
+        return value
+
+    def add(self, query_embedding: np.ndarray, value: Any, namespace: str = ""):
+        """
+        Store a response for a query.
+
+        Args:
+            query_embedding: Embedding of the query
+            value: Response to cache
+            namespace: Cache namespace to store in
+        """
+        with self._lock:
+            if namespace not in self._indexes:
+                self._indexes[namespace] = faiss.IndexFlatIP(self.embedding_dim)
+                self._values[namespace] = []
+                self._last_used[namespace] = []
+
+            self._clock += 1
+            self._indexes[namespace].add(self._prepare(query_embedding))
+            self._values[namespace].append(value)
+            self._last_used[namespace].append(self._clock)
+
+            if len(self) > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """Drop the least recently used quarter of the entries (caller holds the lock)."""
+        ticks = sorted(tick for used in self._last_used.values() for tick in used)
+        keep_count = max(1, self.max_entries * 3 // 4)
+        cutoff = ticks[-keep_count]
+
+        for namespace in list(self._indexes):
+            used = self._last_used[namespace]
+            keep = [i for i, tick in enumerate(used) if tick >= cutoff]
+            if len(keep) == len(used):
+                continue
+
+            if not keep:
+                del self._indexes[namespace], self._values[namespace], self._last_used[namespace]
+                continue
+
+            # Flat indexes cannot remove entries cheaply; rebuild from the kept vectors
+            index = self._indexes[namespace]
+            vectors = index.reconstruct_n(0, index.ntotal)[keep]
+            rebuilt = faiss.IndexFlatIP(self.embedding_dim)
+            rebuilt.add(vectors)
+
+            self._indexes[namespace] = rebuilt
+            self._values[namespace] = [self._values[namespace][i] for i in keep]
+            self._last_used[namespace] = [used[i] for i in keep]
+
+        logger.info(f"{self.name} cache evicted down to {len(self)} entries")
+
+    def clear(self):
+        """Remove all cached responses."""
+        with self._lock:
+            self._indexes.clear()
+            self._values.clear()
+            self._last_used.clear()
@@ -5,23 +5,73 @@ Handles context retrieval and formatting for the RAG pipeline.
 """
 
 import logging
+from collections import Counter
+from functools import lru_cache
 from typing import List, Optional, Tuple
 from dataclasses import dataclass, field
 
+import numpy as np
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+from config import get_rag_config
+
 from .embeddings import EmbeddingManager
 from .text_processor import TextChunk, TextProcessor
 from .document_loader import Document
+from .response_cache import ExactCache
 
 logger = logging.getLogger(__name__)
 
+TRUNCATION_NOTICE = "\n\n[Context truncated...]"
+
+# Context budget for LLM prompts; the character cap applies only when
+# tiktoken is unavailable
+MAX_CONTEXT_TOKENS = 1200
+MAX_CONTEXT_CHARS = 4000
+
+DEFAULT_SYSTEM_PROMPT = """You are Z.M.ai, an academic policy assistant. Your role is to help students understand university policies accurately.
+
+IMPORTANT RULES:
+1. ONLY answer based on the context provided above
+2. If the answer is not in the context, say "I don't have enough information about this in the policy documents."
+3. Do NOT make up or guess any information
+4. Do NOT add information from outside the provided context
+5. Keep answers clear, concise, and helpful
+6. If you're uncertain, say so rather than guessing
+
+Format your response in a clear, readable way with bullet points or numbered lists where appropriate."""
+
+_PROMPT_TEMPLATE = """{system_prompt}
+
+CONTEXT FROM DOCUMENTS:
+{context}
+
+USER QUESTION:
+{query}
+
+ANSWER:"""
+
 
 @dataclass
 class RetrievalResult:
-    """Result from a retrieval operation."""
+    """
+    Result from a retrieval operation.
+
+    Treat chunks and scores as read-only after construction: the formatted
+    context text and source lists are built on first access and then reused.
+    """
     chunks: List[TextChunk] = field(default_factory=list)
     scores: List[float] = field(default_factory=list)
     query: str = ""
     total_chunks_found: int = 0
+    _context_text: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _unique_sources: Optional[List[str]] = field(default=None, init=False, repr=False, compare=False)
+    _sources_with_pages: Optional[List[str]] = field(default=None, init=False, repr=False, compare=False)
+    _prompt_context: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     @property
     def has_context(self) -> bool:
@@ -31,54 +81,108 @@ class RetrievalResult:
     @property
     def context_text(self) -> str:
         """Get combined context text from all chunks."""
+        if self._context_text is None:
+            self._context_text = self._build_context()
+        return self._context_text
+
+    @property
+    def prompt_context(self) -> str:
+        """Get the context text truncated to the LLM prompt budget."""
+        if self._prompt_context is None:
+            self._prompt_context = truncate_context(self.context_text)
+        return self._prompt_context
+
+    def _build_context(self) -> str:
+        """
+        Format every chunk as a block under its source label.
+
+        Blocks follow document order (source, then chunk index) rather than
+        score order and carry no per-query score, so the same set of chunks
+        always yields byte-identical text. Provider prompt caches only hit on
+        identical token prefixes, so keep this ordering stable.
+        """
         if not self.chunks:
             return ""
 
-        parts = []
-        for chunk, score in zip(self.chunks, self.scores):
-            source_label = self._format_source_label(chunk)
-            parts.append(f"[{source_label}] (relevance: {score:.2f})")
-            parts.append(chunk.content)
-            parts.append("")  # Empty line between chunks
-
+        ordered = sorted(self.chunks, key=lambda chunk: (chunk.source, chunk.chunk_index))
+        parts = [f"[{self._format_source_label(chunk)}]\n{chunk.content}\n" for chunk in ordered]
         return "\n".join(parts)
 
     def _format_source_label(self, chunk: TextChunk) -> str:
         """Format a source label for a chunk."""
         if chunk.source_type == "pdf":
-            from pathlib import Path
-            name = Path(chunk.source).name
             if chunk.page_numbers:
-                return f"PDF: {name}, Page {chunk.page_numbers[0]}"
-            return f"PDF: {name}"
+                return f"PDF: {chunk.source_name}, Page {chunk.page_numbers[0]}"
+            return f"PDF: {chunk.source_name}"
         else:
             return f"Website: {chunk.source}"
 
     def get_unique_sources(self) -> List[str]:
         """Get list of unique sources."""
-        sources = set()
-        for chunk in self.chunks:
-            if chunk.source_type == "pdf":
-                from pathlib import Path
-                sources.add(f"📄 {Path(chunk.source).name}")
-            else:
-                sources.add(f"🌐 Website")
-        return list(sources)
+        if self._unique_sources is None:
+            sources = set()
+            for chunk in self.chunks:
+                if chunk.source_type == "pdf":
+                    sources.add(f"📄 {chunk.source_name}")
+                else:
+                    sources.add(f"🌐 Website")
+            self._unique_sources = list(sources)
+        return list(self._unique_sources)
 
     def get_sources_with_pages(self) -> List[str]:
         """Get detailed source list with page numbers."""
-        sources = []
-        for chunk in self.chunks:
-            if chunk.source_type == "pdf":
-                from pathlib import Path
-                name = Path(chunk.source).name
-                if chunk.page_numbers:
-                    sources.append(f"📄 {name} (Page {chunk.page_numbers[0]})")
+        if self._sources_with_pages is None:
+            sources = []
+            for chunk in self.chunks:
+                if chunk.source_type == "pdf":
+                    if chunk.page_numbers:
+                        sources.append(f"📄 {chunk.source_name} (Page {chunk.page_numbers[0]})")
+                    else:
+                        sources.append(f"📄 {chunk.source_name}")
                 else:
-                    sources.append(f"📄 {name}")
-            else:
-                sources.append(f"🌐 Website")
-        return sources
+                    sources.append(f"🌐 Website")
+            self._sources_with_pages = sources
+        return list(self._sources_with_pages)
+
+
+@lru_cache(maxsize=1)
+def _get_token_encoding():
+    """Get the shared tiktoken encoding, or None when tiktoken is unusable."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # The encoding file is downloaded on first use and may be unreachable
+        logger.warning("tiktoken encoding unavailable, truncating by characters: %s", e)
+        return None
+
+
+def truncate_context(
+    context: str,
+    max_tokens: int = MAX_CONTEXT_TOKENS,
+    max_chars: int = MAX_CONTEXT_CHARS,
+) -> str:
+    """
+    Truncate context text to a token budget.
+
+    Args:
+        context: Context text to truncate
+        max_tokens: Maximum tokens to include
+        max_chars: Maximum characters to include when tiktoken is unavailable
+
+    Returns:
+        The context, cut to the budget with a truncation notice if it was longer
+    """
+    encoding = _get_token_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(context)
+        if len(tokens) > max_tokens:
+            return encoding.decode(tokens[:max_tokens]) + TRUNCATION_NOTICE
+    elif len(context) > max_chars:
+        return context[:max_chars] + TRUNCATION_NOTICE
+
+    return context
 
 
 class Retriever:
@@ -101,6 +205,7 @@ class Retriever:
         query: str,
         top_k: Optional[int] = None,
         min_score: Optional[float] = None,
+        query_embedding: Optional[np.ndarray] = None,
     ) -> RetrievalResult:
         """
         Retrieve relevant context for a query.
@@ -109,6 +214,7 @@ class Retriever:
             query: User query
             top_k: Maximum number of chunks to retrieve
             min_score: Minimum similarity score threshold
+            query_embedding: Precomputed query embedding, so the query is not embedded again
 
         Returns:
             RetrievalResult with relevant chunks
@@ -121,29 +227,71 @@ class Retriever:
             return RetrievalResult(query=query)
 
         # Search for relevant chunks
-        chunk_results = self.embedding_manager.search(clean_query, top_k=top_k)
+        chunk_results = self.embedding_manager.search(
+            clean_query, top_k=top_k, query_embedding=query_embedding
+        )
+
+        return self._to_result(query, chunk_results, min_score)
+
+    def retrieve_batch(
+        self,
+        queries: List[str],
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None,
+        query_embeddings: Optional[np.ndarray] = None,
+    ) -> List[RetrievalResult]:
+        """
+        Retrieve relevant context for several queries with one batched search.
 
+        Args:
+            queries: User queries
+            top_k: Maximum number of chunks to retrieve per query
+            min_score: Minimum similarity score threshold
+            query_embeddings: Precomputed query embeddings (one row per query)
+
+        Returns:
+            One RetrievalResult per query, in the same order
+        """
+        clean_queries = [self.text_processor.process_query(query) for query in queries]
+        searchable = [i for i, clean_query in enumerate(clean_queries) if clean_query]
+
+        results = [RetrievalResult(query=query) for query in queries]
+        if not searchable:
+            return results
+
+        all_chunk_results = self.embedding_manager.search_batch(
+            [clean_queries[i] for i in searchable],
+            top_k=top_k,
+            query_embeddings=None if query_embeddings is None else query_embeddings[searchable],
+        )
+
+        for i, chunk_results in zip(searchable, all_chunk_results):
+            results[i] = self._to_result(queries[i], chunk_results, min_score)
+
+        return results
+
+    def _to_result(
+        self,
+        query: str,
+        chunk_results: List[Tuple[TextChunk, float]],
+        min_score: Optional[float],
+    ) -> RetrievalResult:
+        """Build a RetrievalResult from search hits, applying the score filter."""
         if not chunk_results:
-            logger.info(f"No relevant chunks found for query: {query[:50]}...")
+            logger.info("No relevant chunks found for query: %.50s...", query)
             return RetrievalResult(query=query)
 
-        # Extract chunks and scores
-        chunks = [chunk for chunk, _ in chunk_results]
-        scores = [score for _, score in chunk_results]
+        # Extract chunks and scores in one pass
+        chunks, scores = map(list, zip(*chunk_results))
 
         # Filter by minimum score if specified
-        if min_score is not None:
-            filtered_chunks = []
-            filtered_scores = []
-            for chunk, score in zip(chunks, scores):
-                if score >= min_score:
-                    filtered_chunks.append(chunk)
-                    filtered_scores.append(score)
+        if min_score is not None and scores:
+            scores_arr = np.asarray(scores, dtype=np.float32)
+            mask = scores_arr >= min_score
+            chunks = [chunks[i] for i in np.flatnonzero(mask).tolist()]
+            scores = scores_arr[mask].tolist()
 
-            chunks = filtered_chunks
-            scores = filtered_scores
-
-        logger.info(f"Retrieved {len(chunks)} chunks for query: {query[:50]}...")
+        logger.info("Retrieved %d chunks for query: %.50s...", len(chunks), query)
 
         return RetrievalResult(
             chunks=chunks,
@@ -152,13 +300,19 @@ class Retriever:
             total_chunks_found=len(chunk_results),
         )
 
-    def format_context_for_llm(self, result: RetrievalResult, max_chars: int = 4000) -> str:
+    def format_context_for_llm(
+        self,
+        result: RetrievalResult,
+        max_chars: int = MAX_CONTEXT_CHARS,
+        max_tokens: int = MAX_CONTEXT_TOKENS,
+    ) -> str:
         """
         Format retrieved context for LLM consumption.
 
         Args:
             result: RetrievalResult from retrieve()
-            max_chars: Maximum characters to include
+            max_chars: Maximum characters to include when tiktoken is unavailable
+            max_tokens: Maximum tokens to include
 
         Returns:
             Formatted context string
@@ -166,13 +320,11 @@ class Retriever:
         if not result.has_context:
             return "No relevant information found in the documents."
 
-        context = result.context_text
-
-        # Truncate if necessary
-        if len(context) > max_chars:
-            context = context[:max_chars] + "\n\n[Context truncated...]"
+        if max_tokens == MAX_CONTEXT_TOKENS and max_chars == MAX_CONTEXT_CHARS:
+            # Same budget as the LLM prompts, truncated once per result
+            return result.prompt_context
 
-        return context
+        return truncate_context(result.context_text, max_tokens=max_tokens, max_chars=max_chars)
 
     def build_prompt(
         self,
@@ -196,31 +348,15 @@ class Retriever:
 
         context = self.format_context_for_llm(retrieval_result)
 
-        prompt = f"""{system_prompt}
-
-CONTEXT FROM DOCUMENTS:
-{context}
-
-USER QUESTION:
-{query}
-
-ANSWER:"""
-
-        return prompt
+        return _PROMPT_TEMPLATE.format_map({
+            "system_prompt": system_prompt,
+            "context": context,
+            "query": query,
+        })
 
     def _get_default_system_prompt(self) -> str:
         """Get the default system prompt."""
-        return """You are Z.M.ai, an academic policy assistant. Your role is to help students understand university policies accurately.
-
-IMPORTANT RULES:
-1. ONLY answer based on the context provided above
-2. If the answer is not in the context, say "I don't have enough information about this in the policy documents."
-3. Do NOT make up or guess any information
-4. Do NOT add information from outside the provided context
-5. Keep answers clear, concise, and helpful
-6. If you're uncertain, say so rather than guessing
-
-Format your response in a clear, readable way with bullet points or numbered lists where appropriate."""
+        return DEFAULT_SYSTEM_PROMPT
 
     def retrieve_and_format(
         self,
@@ -254,6 +390,11 @@ class RAGPipeline:
         self.retriever = Retriever()
         self.documents: List[Document] = []
         self.is_initialized = False
+        self.config = get_rag_config()
+
+        # Repeated questions (e.g. Streamlit reruns) skip embedding and search;
+        # cleared whenever the index changes
+        self._retrieval_cache = ExactCache(self.config.retrieval_cache_size)
 
     def initialize(self, documents: List[Document]) -> bool:
         """
@@ -269,7 +410,7 @@ class RAGPipeline:
             logger.warning("No documents provided for initialization")
             return False
 
-        logger.info(f"Initializing RAG pipeline with {len(documents)} documents...")
+        logger.info("Initializing RAG pipeline with %d documents...", len(documents))
 
         self.documents = documents
 
@@ -281,19 +422,106 @@ class RAGPipeline:
             logger.error("No chunks generated from documents")
             return False
 
-        # Create embedding index
-        self.retriever.embedding_manager.create_index(chunks)
+        # Reuse the persisted index for identical chunks, otherwise embed and persist
+        embedding_manager = self.retriever.embedding_manager
+        index_dir = embedding_manager.index_cache_dir(chunks)
+
+        if not (self.config.index_cache_enabled and embedding_manager.load_index(index_dir)):
+            embedding_manager.create_index(chunks)
+            if self.config.index_cache_enabled:
+                embedding_manager.save_index(index_dir)
+
+        self._retrieval_cache.clear()
 
         self.is_initialized = True
-        logger.info(f"RAG pipeline initialized successfully")
+        logger.info("RAG pipeline initialized successfully")
         return True
 
-    def query(self, user_query: str) -> RetrievalResult:
+    def add_documents(self, documents: List[Document]) -> int:
+        """
+        Add documents to an initialized pipeline incrementally.
+
+        Args:
+            documents: List of Documents to index
+
+        Returns:
+            Number of new chunks indexed
+        """
+        if not self.is_initialized:
+            return self._count_chunks() if self.initialize(documents) else 0
+
+        chunks = TextProcessor().process_documents(documents)
+        added = self.retriever.embedding_manager.add_chunks(chunks)
+
+        if added:
+            self.documents.extend(documents)
+            self._retrieval_cache.clear()
+
+        logger.info("Added %d new chunks from %d documents", added, len(documents))
+        return added
+
+    def _count_chunks(self) -> int:
+        """Number of chunks in the vector store."""
+        return len(self.retriever.embedding_manager.vector_store.chunks)
+
+    def query_batch(
+        self,
+        user_queries: List[str],
+        query_embeddings: Optional[np.ndarray] = None,
+    ) -> List[RetrievalResult]:
+        """
+        Query the RAG pipeline with several questions at once.
+
+        Args:
+            user_queries: Users' questions
+            query_embeddings: Precomputed question embeddings (one row per question)
+
+        Returns:
+            One RetrievalResult per question, in the same order
+        """
+        if not self.is_initialized:
+            logger.error("Pipeline not initialized")
+            return [RetrievalResult(query=user_query) for user_query in user_queries]
+
+        results = [self._retrieval_cache.get(user_query) for user_query in user_queries]
+        misses = [i for i, result in enumerate(results) if result is None]
+        if not misses:
+            return results
+
+        found = self.retriever.retrieve_batch(
+            [user_queries[i] for i in misses],
+            query_embeddings=None if query_embeddings is None else query_embeddings[misses],
+        )
+
+        for i, result in zip(misses, found):
+            self._retrieval_cache.put(user_queries[i], result)
+            results[i] = result
+
+        return results
+
+    def cached_query(self, user_query: str) -> Optional[RetrievalResult]:
+        """
+        Get the cached result of an earlier identical question, without retrieving.
+
+        Lets callers skip embedding the question when it has been answered before.
+
+        Args:
+            user_query: User's question
+
+        Returns:
+            The cached RetrievalResult, or None on a miss
+        """
+        if not self.is_initialized:
+            return None
+        return self._retrieval_cache.get(user_query)
+
+    def query(self, user_query: str, query_embedding: Optional[np.ndarray] = None) -> RetrievalResult:
         """
         Query the RAG pipeline.
 
         Args:
             user_query: User's question
+            query_embedding: Precomputed embedding of the question (see EmbeddingManager.embed_query)
 
         Returns:
             RetrievalResult with relevant context
@@ -302,7 +530,12 @@ class RAGPipeline:
             logger.error("Pipeline not initialized")
             return RetrievalResult(query=user_query)
 
-        return self.retriever.retrieve(user_query)
+        if (cached := self._retrieval_cache.get(user_query)) is not None:
+            return cached
+
+        result = self.retriever.retrieve(user_query, query_embedding=query_embedding)
+        self._retrieval_cache.put(user_query, result)
+        return result
 
     def get_stats(self) -> dict:
         """Get statistics about the pipeline."""
@@ -314,8 +547,5 @@ class RAGPipeline:
 
     def _count_document_types(self) -> dict:
         """Count documents by type."""
-        types = {"pdf": 0, "web": 0}
-        for doc in self.documents:
-            if doc.source_type in types:
-                types[doc.source_type] += 1
-        return types
+        counts = Counter(doc.source_type for doc in self.documents)
+        return {"pdf": counts["pdf"], "web": counts["web"]}
@@ -4,34 +4,111 @@ Z.M.ai - Text Processor
 Handles text chunking and cleaning for the RAG pipeline.
 """
 
+import bisect
 import re
 import logging
-from typing import List, Optional
-from dataclasses import dataclass
+import string
+import sys
+from collections import Counter
+from functools import lru_cache
+from itertools import chain
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field
+
+import numpy as np
 
 from config import get_rag_config
 from .document_loader import Document
 
 logger = logging.getLogger(__name__)
 
+# Compiled once; clean() runs on every document and every query
+_RE_NEWLINES = re.compile(r"\n{3,}")
+_RE_SPACES = re.compile(r"[ \t]+")
+_CR_TABLE = str.maketrans("", "", "\r")
+# Sentence-ending punctuation followed by a space and another character, or
+# by the end of the text (the capital-letter check is done in Python)
+_RE_SENTENCE_END = re.compile(r"[.!?](?=\Z| \S)")
+_QUOTE_TABLE = str.maketrans({"\u201c": '"', "\u201d": '"', "\u2018": "'", "\u2019": "'"})
+
+
+@lru_cache(maxsize=16)
+def _allowed_chars(keep: str) -> frozenset:
+    """Get the ASCII letters and digits plus the extra characters to keep."""
+    return frozenset(string.ascii_letters + string.digits + keep)
 
-@dataclass
+
+@dataclass(slots=True)
 class TextChunk:
-    """Represents a chunk of text with metadata."""
+    """
+    Represents a chunk of text with metadata.
+
+    Slotted (no per-instance __dict__) since an index holds one per chunk.
+    """
     content: str
     source: str
     source_type: str
     chunk_index: int
     page_numbers: Optional[List[int]] = None
     metadata: dict = None
+    # File name of the source, parsed once per chunk
+    source_name: str = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if self.metadata is None:
             self.metadata = {}
+        # Interned so source type checks hit the identity fast path of ==
+        self.source_type = sys.intern(self.source_type)
+        self.source_name = Path(self.source).name
+
+    @classmethod
+    def create(
+        cls,
+        content: str,
+        source: str,
+        source_type: str,
+        chunk_index: int,
+        page_numbers: Optional[List[int]],
+        metadata: dict,
+        source_name: str,
+    ) -> "TextChunk":
+        """
+        Build a chunk without running __init__ and __post_init__.
+
+        For bulk chunking, where the caller already has the metadata dict,
+        the interned source type and the source's file name.
+
+        Args:
+            content: Chunk text
+            source: Source path or URL
+            source_type: Interned source type
+            chunk_index: Position of the chunk in its document
+            page_numbers: Pages the chunk came from
+            metadata: Chunk metadata
+            source_name: File name of the source
+
+        Returns:
+            TextChunk instance
+        """
+        chunk = cls.__new__(cls)
+        chunk.content = content
+        chunk.source = source
+        chunk.source_type = source_type
+        chunk.chunk_index = chunk_index
+        chunk.page_numbers = page_numbers
+        chunk.metadata = metadata
+        chunk.source_name = source_name
+        return chunk
 
     def __len__(self) -> int:
         return len(self.content)
 
+    @property
+    def chunk_size(self) -> int:
+        """Length of the chunk text in characters."""
+        return len(self.content)
+
     def to_dict(self) -> dict:
         """Convert chunk to dictionary."""
         return {
@@ -40,7 +117,7 @@ class TextChunk:
             "source_type": self.source_type,
             "chunk_index": self.chunk_index,
             "page_numbers": self.page_numbers,
-            "metadata": self.metadata,
+            "metadata": {**self.metadata, "chunk_size": self.chunk_size},
         }
 
 
@@ -68,14 +145,19 @@ class TextCleaner:
         if not text:
             return ""
 
+        # Most queries have nothing for the passes below to change; four
+        # substring probes are much cheaper than the translate and two regexes
+        if not ("\r" in text or "\n\n\n" in text or "  " in text or "\t" in text):
+            return text.strip()
+
         # Remove carriage returns
-        text = text.replace("\r", "")
+        text = text.translate(_CR_TABLE)
 
         # Normalize multiple newlines to double newline
-        text = re.sub(r"\n{3,}", "\n\n", text)
+        text = _RE_NEWLINES.sub("\n\n", text)
 
         # Normalize multiple spaces to single space
-        text = re.sub(r"[ \t]+", " ", text)
+        text = _RE_SPACES.sub(" ", text)
 
         # Remove leading/trailing whitespace
         text = text.strip()
@@ -85,10 +167,8 @@ class TextCleaner:
     @staticmethod
     def normalize_quotes(text: str) -> str:
         """Normalize different quote characters to standard quotes."""
-        # Curly quotes to straight quotes
-        text = text.replace("\u201c", '"').replace("\u201d", '"')  # Double quotes
-        text = text.replace("\u2018", "'").replace("\u2019", "'")  # Single quotes
-        return text
+        # Curly quotes to straight quotes, in a single pass
+        return text.translate(_QUOTE_TABLE)
 
     @staticmethod
     def remove_special_chars(text: str, keep: str = ".!?,;:") -> str:
@@ -102,9 +182,24 @@ class TextCleaner:
         Returns:
             Text with special chars removed
         """
-        # Build pattern to keep alphanumeric and specified chars
-        pattern = f"[^a-zA-Z0-9\\s{re.escape(keep)}]"
-        return re.sub(pattern, "", text)
+        # Delete every distinct character that is not allowed (whitespace
+        # always is) in one translate pass
+        allowed = _allowed_chars(keep)
+        return text.translate(dict.fromkeys(
+            ord(char) for char in set(text) if char not in allowed and not char.isspace()
+        ))
+
+
+@lru_cache(maxsize=256)
+def _clean_document_text(text: str) -> str:
+    """
+    Clean a document's text once, however often it is re-chunked.
+
+    Keyed on the text itself rather than the source: every page of a PDF
+    shares the same source. Rebuilding the index (or re-ingesting the same
+    files) hits the cache instead of re-running the regex passes.
+    """
+    return TextCleaner.clean(text)
 
 
 class TextChunker:
@@ -135,22 +230,31 @@ class TextChunker:
         Returns:
             List of TextChunk objects
         """
-        cleaned_text = self.cleaner.clean(document.content)
-        chunks = self._split_text(cleaned_text)
-
-        text_chunks = []
-        for i, chunk_content in enumerate(chunks):
-            text_chunks.append(TextChunk(
-                content=chunk_content,
-                source=document.source,
-                source_type=document.source_type,
-                chunk_index=i,
-                page_numbers=document.page_numbers,
-                metadata={
-                    **document.metadata,
-                    "chunk_size": len(chunk_content),
-                }
-            ))
+        cleaned_text = _clean_document_text(document.content)
+
+        # Everything shared by the document's chunks is looked up once, and
+        # each chunk string is wrapped as soon as it is cut. The chunks share
+        # the document's metadata dict (treat it as read-only); the chunk
+        # size is derived from the content instead of stored per chunk.
+        make_chunk = TextChunk.create
+        source = document.source
+        source_type = sys.intern(document.source_type)
+        source_name = Path(source).name
+        page_numbers = document.page_numbers
+        base_metadata = document.metadata
+
+        text_chunks = [
+            make_chunk(
+                chunk_content,
+                source,
+                source_type,
+                i,
+                page_numbers,
+                base_metadata,
+                source_name,
+            )
+            for i, chunk_content in enumerate(self._iter_chunks(cleaned_text))
+        ]
 
         logger.debug(f"Created {len(text_chunks)} chunks from {document.source}")
         return text_chunks
@@ -165,11 +269,7 @@ class TextChunker:
         Returns:
             List of TextChunk objects from all documents
         """
-        all_chunks = []
-
-        for doc in documents:
-            chunks = self.chunk_document(doc)
-            all_chunks.extend(chunks)
+        all_chunks = list(chain.from_iterable(self.chunk_document(doc) for doc in documents))
 
         logger.info(f"Created {len(all_chunks)} total chunks from {len(documents)} documents")
         return all_chunks
@@ -184,51 +284,100 @@ class TextChunker:
         Returns:
             List of text chunks
         """
+        return list(self._iter_chunks(text))
+
+    def _iter_chunks(self, text: str) -> Iterator[str]:
+        """
+        Lazily split text into chunks using a sliding window approach.
+
+        Args:
+            text: Text to split
+
+        Yields:
+            Text chunks, in order
+        """
         if len(text) <= self.chunk_size:
-            return [text] if text.strip() else []
+            if text.strip():
+                yield text
+            return
+
+        # Only the spans are computed up front; each chunk string is sliced
+        # at the point it is consumed
+        for start, end in self._chunk_spans(text):
+            chunk = text[start:end].strip()
+            if chunk:
+                yield chunk
+
+    def _chunk_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Compute the (start, end) window of every chunk in one pass.
+
+        Windows advance by ``chunk_size - chunk_overlap`` from the previous
+        end, which is snapped back to a sentence (or word) boundary, so no
+        text between windows is ever skipped.
+
+        Args:
+            text: Text to split
+
+        Yields:
+            (start, end) character offsets, in order
+        """
+        # Find every sentence boundary in one regex sweep; each window then
+        # only needs a binary search
+        text_len = len(text)
+        sentence_ends = [
+            pos for pos in (match.end() for match in _RE_SENTENCE_END.finditer(text))
+            if pos == text_len or text[pos + 1].isupper()
+        ]
+
+        # Locals instead of attribute lookups on every window
+        chunk_size = self.chunk_size
+        chunk_overlap = self.chunk_overlap
+        find_sentence_boundary = self._find_sentence_boundary
 
-        chunks = []
         start = 0
-        chunk_index = 0
+        prev_end = 0
 
-        while start < len(text):
+        while start < text_len:
             # Calculate end position
-            end = start + self.chunk_size
+            end = start + chunk_size
+
+            # Each chunk must extend past the previous one, or it would be
+            # fully contained in it
+            min_end = max(start, prev_end)
 
             # If this isn't the last chunk, try to break at a sentence boundary
-            if end < len(text):
+            if end < text_len:
                 # Look for sentence endings near the chunk boundary
-                boundary = self._find_sentence_boundary(text, start, end)
+                boundary = find_sentence_boundary(sentence_ends, min_end, end)
 
-                if boundary > start:
+                if boundary > min_end:
                     end = boundary
                 else:
                     # No good boundary found, try to break at a word boundary
                     boundary = self._find_word_boundary(text, end)
-                    if boundary > start:
+                    if boundary > min_end:
                         end = boundary
 
-            # Extract the chunk
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
-
-            # Move start position with overlap
-            start = end - self.chunk_overlap
-            chunk_index += 1
+            yield start, end
 
-            # Avoid infinite loop
-            if start <= 0:
-                start = end
+            # This chunk reached the end of the text; stepping back by the
+            # overlap would only emit a duplicate of its tail
+            if end >= text_len:
+                break
 
-        return chunks
+            # Move start position with overlap, always making forward progress
+            # (a boundary found close to start could otherwise move it backwards)
+            next_start = end - chunk_overlap
+            start = next_start if next_start > start else end
+            prev_end = end
 
-    def _find_sentence_boundary(self, text: str, start: int, end: int) -> int:
+    def _find_sentence_boundary(self, sentence_ends: List[int], start: int, end: int) -> int:
         """
         Find a good sentence boundary near the end position.
 
         Args:
-            text: Full text
+            sentence_ends: Sorted positions just past each sentence ending
             start: Current start position
             end: Current end position
 
@@ -238,23 +387,9 @@ class TextChunker:
         # Look for sentence endings within a reasonable range before end
         search_start = max(start, end - 200)
 
-        # Sentence endings (period, question mark, exclamation)
-        for pos in range(end - 1, search_start, -1):
-            char = text[pos]
-            if char in ".!?":
-                # Check if it's followed by space and capital letter or end of text
-                next_pos = pos + 1
-                if next_pos >= len(text):
-                    return pos + 1
-                if text[next_pos] == " ":
-                    next_next = next_pos + 1
-                    if next_next < len(text) and text[next_next].isupper():
-                        return pos + 1
-                # Also accept abbreviations with periods
-                if char == "." and pos > 0:
-                    prev_char = text[pos - 1]
-                    if prev_char.isupper():  # Likely an abbreviation
-                        continue
+        idx = bisect.bisect_right(sentence_ends, end) - 1
+        if idx >= 0 and sentence_ends[idx] > search_start + 1:
+            return sentence_ends[idx]
 
         return start  # No good boundary found
 
@@ -270,11 +405,8 @@ class TextChunker:
             Position of word boundary, or end if none found
         """
         # Look backwards for a space
-        for pos in range(end - 1, max(0, end - 100), -1):
-            if text[pos] == " ":
-                return pos + 1
-
-        return end
+        pos = text.rfind(" ", max(0, end - 100) + 1, end)
+        return pos + 1 if pos >= 0 else end
 
 
 class TextProcessor:
@@ -331,17 +463,15 @@ class TextProcessor:
         if not chunks:
             return {"count": 0, "total_chars": 0, "avg_chars": 0}
 
-        total_chars = sum(len(c) for c in chunks)
-        source_types = {}
-
-        for chunk in chunks:
-            source_types[chunk.source_type] = source_types.get(chunk.source_type, 0) + 1
+        # One pass to collect the lengths, then C-level reductions
+        lengths = np.fromiter((len(c) for c in chunks), dtype=np.int64, count=len(chunks))
+        total_chars = int(lengths.sum())
 
         return {
             "count": len(chunks),
             "total_chars": total_chars,
             "avg_chars": total_chars // len(chunks),
-            "min_chars": min(len(c) for c in chunks),
-            "max_chars": max(len(c) for c in chunks),
-            "source_types": source_types,
+            "min_chars": int(lengths.min()),
+            "max_chars": int(lengths.max()),
+            "source_types": dict(Counter(chunk.source_type for chunk in chunks)),
         }
@@ -5,18 +5,22 @@ Main chat interface that handles user interactions.
 """
 
 import logging
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass, field
 
 import streamlit as st
 
-from config import get_ui_config, get_groq_config
-from core import RAGPipeline, RAGLLMHandler, DocumentLoader
+from config import get_ui_config, get_groq_config, get_rag_config
+from core import RAGPipeline, RAGLLMHandler, DocumentLoader, EmbeddingModel, QueryBatcher, clear_index_cache
 from . import (
     inject_custom_css,
     render_header,
     render_welcome_message,
     render_message,
+    render_input_area,
     render_sidebar,
     render_footer,
     render_loading_state,
@@ -26,7 +30,105 @@ from . import (
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+class PipelineInitializationError(RuntimeError):
+    """Raised when the knowledge base cannot be built."""
+
+
+# Single worker, so at most one knowledge base build runs at a time
+_INIT_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-init")
+
+# How often a session waiting for the build reruns to check on it
+INIT_POLL_SECONDS = 0.5
+
+
+def _build_rag_pipeline(document_loader: DocumentLoader) -> RAGPipeline:
+    """
+    Load, chunk and index every source into a new RAG pipeline.
+
+    Args:
+        document_loader: Loader used to fetch the sources
+
+    Returns:
+        Initialized RAGPipeline
+
+    Raises:
+        PipelineInitializationError: If no documents could be loaded or indexed
+    """
+    documents = document_loader.load_all_sources()
+
+    if not documents:
+        raise PipelineInitializationError(
+            "No documents could be loaded. Please check that the PDF file exists "
+            "and the website is accessible."
+        )
+
+    pipeline = RAGPipeline()
+    if not pipeline.initialize(documents):
+        raise PipelineInitializationError(
+            "Failed to initialize the knowledge base. Please try again."
+        )
+
+    logger.info("RAG pipeline initialized successfully")
+    return pipeline
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _start_pipeline_build(sources_fingerprint: str, _document_loader: DocumentLoader) -> "Future[RAGPipeline]":
+    """
+    Start building the RAG pipeline in the background, once for all sessions.
+
+    Streamlit re-executes the script on every interaction; caching the future
+    keeps the finished pipeline (embedding model and FAISS index) in memory
+    across sessions and reruns, while the build itself no longer blocks the
+    page from rendering.
+
+    Args:
+        sources_fingerprint: Fingerprint of the data sources; a new value
+            rebuilds the pipeline and evicts the old one
+        _document_loader: Loader used to fetch the sources (not hashed)
+
+    Returns:
+        Future resolving to the initialized RAGPipeline
+    """
+    return _INIT_EXECUTOR.submit(_build_rag_pipeline, _document_loader)
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _get_query_batcher(sources_fingerprint: str, _pipeline: RAGPipeline) -> QueryBatcher:
+    """
+    Get the retrieval batcher shared by all sessions.
+
+    Questions asked at the same time in different sessions are retrieved
+    together in one batched search.
+
+    Args:
+        sources_fingerprint: Fingerprint of the data sources, so the batcher
+            follows the pipeline when the documents change
+        _pipeline: Initialized pipeline to query (not hashed)
+    """
+    return QueryBatcher(_pipeline, max_wait=get_rag_config().query_batch_wait_ms / 1000)
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _get_llm_handler(
+    sources_fingerprint: str,
+    _embedding_model: Optional[EmbeddingModel] = None,
+) -> RAGLLMHandler:
+    """
+    Get the RAG-LLM handler shared by all sessions.
+
+    Caching the handler keeps its semantic response cache alive across
+    Streamlit reruns instead of starting empty on every interaction.
+
+    Args:
+        sources_fingerprint: Fingerprint of the data sources, so cached
+            answers are dropped when the documents change
+        _embedding_model: Embedding model to reuse for the response cache (not hashed)
+    """
+    return RAGLLMHandler(embedding_model=_embedding_model)
+
+
+@dataclass(slots=True)
 class ChatMessage:
     """Represents a single chat message."""
     role: str  # "user", "assistant", "error"
@@ -67,10 +169,11 @@ class ChatInterface:
         self.ui_config = get_ui_config()
         self.groq_config = get_groq_config()
 
-        # Initialize RAG components
+        # RAG components are shared across sessions (see initialize_pipeline)
         self.document_loader = DocumentLoader()
-        self.rag_pipeline = RAGPipeline()
-        self.llm_handler = RAGLLMHandler()
+        self.rag_pipeline: Optional[RAGPipeline] = None
+        self.query_batcher: Optional[QueryBatcher] = None
+        self.llm_handler: Optional[RAGLLMHandler] = None
 
         # Check API key
         self.api_key_configured = bool(self.groq_config.api_key)
@@ -81,11 +184,15 @@ class ChatInterface:
     def _init_session_state(self):
         """Initialize Streamlit session state variables."""
         if "messages" not in st.session_state:
-            st.session_state.messages = []
+            # Bounded: the oldest message is dropped in O(1) once full
+            st.session_state.messages = deque(maxlen=self.ui_config.max_history)
 
         if "pipeline_initialized" not in st.session_state:
             st.session_state.pipeline_initialized = False
 
+        if "pipeline_initializing" not in st.session_state:
+            st.session_state.pipeline_initializing = False
+
         if "initialization_error" not in st.session_state:
             st.session_state.initialization_error = None
 
@@ -93,45 +200,58 @@ class ChatInterface:
         """
         Initialize the RAG pipeline with documents.
 
+        The build runs in a background thread; while it is in progress this
+        returns False with ``pipeline_initializing`` set in the session state.
+        A failed build stays cached, so reruns show its error instead of
+        rebuilding; "Rebuild Index" (or a change to the sources) retries it.
+
         Returns:
-            True if successful, False otherwise
+            True if the pipeline is ready, False otherwise
         """
-        if st.session_state.pipeline_initialized:
+        try:
+            sources_fingerprint = self.document_loader.sources_fingerprint()
+            build = _start_pipeline_build(sources_fingerprint, self.document_loader)
+
+            if not build.done():
+                st.session_state.pipeline_initializing = True
+                return False
+
+            st.session_state.pipeline_initializing = False
+            self.rag_pipeline = build.result()
+            st.session_state.initialization_error = None
+            self.query_batcher = _get_query_batcher(sources_fingerprint, self.rag_pipeline)
+            self.llm_handler = _get_llm_handler(
+                sources_fingerprint,
+                self.rag_pipeline.retriever.embedding_manager.embedding_model,
+            )
+
+            st.session_state.pipeline_initialized = True
             return True
 
-        try:
-            with st.spinner("Loading knowledge base..."):
-                # Load all sources
-                documents = self.document_loader.load_all_sources()
-
-                if not documents:
-                    st.session_state.initialization_error = (
-                        "No documents could be loaded. Please check that the PDF file exists "
-                        "and the website is accessible."
-                    )
-                    return False
-
-                # Initialize pipeline
-                success = self.rag_pipeline.initialize(documents)
-
-                if success:
-                    st.session_state.pipeline_initialized = True
-                    logger.info("RAG pipeline initialized successfully")
-                    return True
-                else:
-                    st.session_state.initialization_error = (
-                        "Failed to initialize the knowledge base. Please try again."
-                    )
-                    return False
+        except PipelineInitializationError as e:
+            st.session_state.pipeline_initializing = False
+            st.session_state.initialization_error = str(e)
+            return False
 
         except Exception as e:
+            st.session_state.pipeline_initializing = False
             logger.error(f"Pipeline initialization error: {e}")
             st.session_state.initialization_error = f"Initialization failed: {str(e)}"
             return False
 
+    def rebuild_index(self):
+        """Drop the persisted and in-memory index so it is rebuilt from the sources."""
+        clear_index_cache()
+        _start_pipeline_build.clear()
+        _get_query_batcher.clear()
+        _get_llm_handler.clear()
+        st.session_state.pipeline_initialized = False
+        st.session_state.initialization_error = None
+        logger.info("Index rebuild requested")
+
     def clear_chat(self):
         """Clear the chat history."""
-        st.session_state.messages = []
+        st.session_state.messages.clear()
         logger.info("Chat cleared")
 
     def add_message(self, role: str, content: str, sources: Optional[List[str]] = None):
@@ -149,14 +269,13 @@ class ChatInterface:
             sources=sources or [],
         ))
 
-        # Limit history size
-        max_history = self.ui_config.max_history
-        if len(st.session_state.messages) > max_history:
-            st.session_state.messages = st.session_state.messages[-max_history:]
-
     def process_user_query(self, query: str) -> bool:
         """
-        Process a user query and generate a response.
+        Process a user query and stream the response into the page.
+
+        The answer is rendered token by token as it arrives, so the user sees
+        the first words after the time-to-first-token instead of waiting for
+        the full completion.
 
         Args:
             query: User's question
@@ -168,7 +287,7 @@ class ChatInterface:
         self.add_message("user", query)
 
         # Check if pipeline is ready
-        if not st.session_state.pipeline_initialized:
+        if self.rag_pipeline is None or self.llm_handler is None:
             self.add_message(
                 "error",
                 "The knowledge base is not ready yet. Please wait for initialization or refresh the page."
@@ -185,16 +304,25 @@ class ChatInterface:
 
         try:
             # Retrieve relevant context
-            retrieval_result = self.rag_pipeline.query(query)
-
-            # Generate response
-            llm_response = self.llm_handler.answer_question(query, retrieval_result)
+            # A repeated question is served from the retrieval cache without
+            # embedding; otherwise embed it once for retrieval and the response cache
+            query_embedding = None
+            with st.spinner("Thinking..."):
+                retrieval_result = self.rag_pipeline.cached_query(query)
+                if retrieval_result is None:
+                    query_embedding = self.rag_pipeline.retriever.embedding_manager.embed_query(query)
+                    retrieval_result = self.query_batcher.query(query, query_embedding=query_embedding)
+
+            # Stream the response
+            content = st.write_stream(
+                self.llm_handler.stream_answer(query, retrieval_result, query_embedding=query_embedding)
+            )
 
             # Add assistant message
             self.add_message(
                 "assistant",
-                llm_response.content,
-                llm_response.sources,
+                content,
+                retrieval_result.get_sources_with_pages(),
             )
 
             return True
@@ -221,7 +349,7 @@ class ChatInterface:
         )
 
         # Render sidebar
-        render_sidebar()
+        render_sidebar(on_rebuild=self.rebuild_index)
 
         # Main header
         render_header(
@@ -231,11 +359,15 @@ class ChatInterface:
             status_color="green" if self.api_key_configured else "red",
         )
 
-        # Initialize pipeline if not done
-        if not st.session_state.pipeline_initialized:
-            if not self.initialize_pipeline():
-                render_error_state(st.session_state.initialization_error or "Initialization failed")
-                return
+        # Attach the shared pipeline (built in the background on first use)
+        if not self.initialize_pipeline():
+            if st.session_state.pipeline_initializing:
+                render_loading_state("Indexing knowledge base...")
+                time.sleep(INIT_POLL_SECONDS)
+                st.rerun()
+
+            render_error_state(st.session_state.initialization_error or "Initialization failed")
+            return
 
         # Show welcome message if no messages
         if not st.session_state.messages:
@@ -258,11 +390,11 @@ class ChatInterface:
 
         # Process user input
         if user_input:
-            # Show processing indicator
-            with st.spinner("Thinking..."):
-                self.process_user_query(user_input)
+            # Show the question right away, then stream the answer below it
+            render_message(role="user", content=user_input)
+            self.process_user_query(user_input)
 
-            # Rerun to display the response
+            # Rerun to display the response with its sources
             st.rerun()
 
         # Render footer
@@ -5,7 +5,9 @@ Reusable UI components for the Streamlit application.
 """
 
 import logging
-from typing import Optional, List, Callable
+from functools import lru_cache
+from html import escape
+from typing import Optional, List, Callable, Tuple
 
 import streamlit as st
 
@@ -21,29 +23,13 @@ from .styles import (
 logger = logging.getLogger(__name__)
 
 
-def render_header(
-    show_clear_button: bool = True,
-    on_clear: Optional[Callable] = None,
-    status_text: str = "Ready",
-    status_color: str = "green",
-) -> None:
-    """
-    Render the application header.
-
-    Args:
-        show_clear_button: Whether to show the clear chat button
-        on_clear: Optional callback when clear is clicked
-        status_text: Status text to display
-        status_color: Color of the status indicator (green, red, amber)
-    """
-    ui_config = get_ui_config()
+# The static parts of the page are rebuilt on every Streamlit rerun; their
+# HTML depends only on a few strings, so each is formatted once per value.
 
-    # Header container
-    col1, col2, col3 = st.columns([2, 1, 1])
-
-    with col1:
-        # Logo and title
-        st.markdown(f"""
+@lru_cache(maxsize=8)
+def _title_html(app_title: str) -> str:
+    """Build the header logo and title HTML."""
+    return f"""
         <div style="display: flex; align-items: center; gap: 12px;">
             <div style="
                 background: linear-gradient(135deg, {COLORS["primary_start"]}, {COLORS["primary_mid"]}, {COLORS["primary_end"]});
@@ -53,21 +39,23 @@ def render_header(
                 font-weight: 700;
                 letter-spacing: -0.02em;
             ">
-                {ui_config.app_title}
+                {app_title}
             </div>
         </div>
-        """, unsafe_allow_html=True)
+        """
 
-    with col2:
-        # Status indicator
-        status_colors = {
-            "green": COLORS["success"],
-            "red": COLORS["error"],
-            "amber": COLORS["warning"],
-        }
-        dot_color = status_colors.get(status_color, COLORS["success"])
-
-        st.markdown(f"""
+
+@lru_cache(maxsize=8)
+def _status_html(status_text: str, status_color: str) -> str:
+    """Build the header status indicator HTML."""
+    status_colors = {
+        "green": COLORS["success"],
+        "red": COLORS["error"],
+        "amber": COLORS["warning"],
+    }
+    dot_color = status_colors.get(status_color, COLORS["success"])
+
+    return f"""
         <div style="
             display: flex;
             align-items: center;
@@ -86,22 +74,13 @@ def render_header(
             "></div>
             <span style="color: {COLORS["text_secondary"]};">{status_text}</span>
         </div>
-        """, unsafe_allow_html=True)
-
-    with col3:
-        # Clear button
-        if show_clear_button:
-            if st.button("Clear Chat", key="header_clear", use_container_width=True):
-                if on_clear:
-                    on_clear()
-                st.rerun()
+        """
 
 
-def render_welcome_message() -> None:
-    """Render the welcome message shown to new users."""
-    ui_config = get_ui_config()
-
-    st.markdown(f"""
+@lru_cache(maxsize=8)
+def _welcome_html(app_title: str, app_subtitle: str) -> str:
+    """Build the welcome banner HTML."""
+    return f"""
     <div style="
         text-align: center;
         padding: 40px 20px;
@@ -115,13 +94,152 @@ def render_welcome_message() -> None:
             font-weight: 700;
             margin-bottom: 16px;
         ">
-            Welcome to {ui_config.app_title}!
+            Welcome to {app_title}!
         </div>
         <div style="color: {COLORS["text_secondary"]}; font-size: 16px; line-height: 1.6;">
-            {ui_config.app_subtitle}
+            {app_subtitle}
         </div>
     </div>
-    """, unsafe_allow_html=True)
+    """
+
+
+@lru_cache(maxsize=8)
+def _sidebar_title_html(app_title: str) -> str:
+    """Build the sidebar title HTML."""
+    return f"""
+        <div style="
+            text-align: center;
+            padding: 20px 0;
+            margin-bottom: 20px;
+            border-bottom: 1px solid {COLORS['border_subtle']};
+        ">
+            <div style="
+                background: linear-gradient(135deg, {COLORS['primary_start']}, {COLORS['primary_mid']}, {COLORS['primary_end']});
+                -webkit-background-clip: text;
+                -webkit-text-fill-color: transparent;
+                font-size: 20px;
+                font-weight: 700;
+            ">
+                {app_title}
+            </div>
+        </div>
+        """
+
+
+@lru_cache(maxsize=8)
+def _sidebar_about_html(app_title: str) -> str:
+    """Build the sidebar about section HTML."""
+    return """
+        <div style="text-align: center; padding: 20px 0;">
+            <div style="font-size: 12px; color: {text_tertiary};">
+                <strong>{app_title}</strong><br>
+                RAG-based Policy Assistant<br>
+                <br>
+                Built with Streamlit + Groq
+            </div>
+        </div>
+        """.format(app_title=app_title, **COLORS)
+
+
+@lru_cache(maxsize=8)
+def _footer_html(app_title: str) -> str:
+    """Build the footer HTML."""
+    return f"""
+    <div style="
+        text-align: center;
+        padding: 20px;
+        color: {COLORS['text_tertiary']};
+        font-size: 12px;
+    ">
+        Powered by {app_title} • RAG-based Academic Policy Assistant
+    </div>
+    """
+
+
+@lru_cache(maxsize=8)
+def _loading_html(message: str) -> str:
+    """Build the loading state HTML."""
+    return f"""
+    <div style="
+        text-align: center;
+        padding: 60px 20px;
+    ">
+        <div class="typing-indicator" style="justify-content: center; margin-bottom: 20px;">
+            <div class="typing-dot"></div>
+            <div class="typing-dot"></div>
+            <div class="typing-dot"></div>
+        </div>
+        <div style="color: {COLORS['text_secondary']};">
+            {message}
+        </div>
+    </div>
+    """
+
+
+# Every rerun re-renders the whole history. Messages never change once
+# added, so their HTML is built once and looked up by content afterwards.
+_SOURCE_TAG = '<span class="source-tag">{}</span>'.format
+
+_user_message_html = lru_cache(maxsize=256)(format_user_message)
+
+
+@lru_cache(maxsize=256)
+def _sources_html(sources: Tuple[str, ...]) -> str:
+    """Build the source citations HTML shown under an answer."""
+    # Sources are file names and URLs; escape them so they display as text
+    source_tags = "".join([_SOURCE_TAG(escape(source)) for source in sources])
+    return f"""
+            <div class="sources-container" style="margin-top: 16px;">
+                <div style="font-size: 12px; color: {COLORS['text_tertiary']}; font-weight: 500; margin-bottom: 8px;">
+                    SOURCES:
+                </div>
+                {source_tags}
+            </div>
+            """
+
+
+def render_header(
+    show_clear_button: bool = True,
+    on_clear: Optional[Callable] = None,
+    status_text: str = "Ready",
+    status_color: str = "green",
+) -> None:
+    """
+    Render the application header.
+
+    Args:
+        show_clear_button: Whether to show the clear chat button
+        on_clear: Optional callback when clear is clicked
+        status_text: Status text to display
+        status_color: Color of the status indicator (green, red, amber)
+    """
+    ui_config = get_ui_config()
+
+    # Header container
+    col1, col2, col3 = st.columns([2, 1, 1])
+
+    with col1:
+        # Logo and title
+        st.markdown(_title_html(ui_config.app_title), unsafe_allow_html=True)
+
+    with col2:
+        # Status indicator
+        st.markdown(_status_html(status_text, status_color), unsafe_allow_html=True)
+
+    with col3:
+        # Clear button
+        if show_clear_button:
+            if st.button("Clear Chat", key="header_clear", use_container_width=True):
+                if on_clear:
+                    on_clear()
+                st.rerun()
+
+
+def render_welcome_message() -> None:
+    """Render the welcome message shown to new users."""
+    ui_config = get_ui_config()
+
+    st.markdown(_welcome_html(ui_config.app_title, ui_config.app_subtitle), unsafe_allow_html=True)
 
     # Display welcome message content
     st.markdown(ui_config.welcome_message)
@@ -143,22 +261,14 @@ def render_message(
         show_avatar: Whether to show avatar
     """
     if role == "user":
-        st.markdown(format_user_message(content), unsafe_allow_html=True)
+        st.markdown(_user_message_html(content), unsafe_allow_html=True)
     elif role == "assistant":
         # Use st.markdown for proper markdown rendering
         st.markdown(content, unsafe_allow_html=True)
 
         # Add sources if present
         if sources:
-            source_tags = "".join([f'<span class="source-tag">{s}</span>' for s in sources])
-            st.markdown(f"""
-            <div class="sources-container" style="margin-top: 16px;">
-                <div style="font-size: 12px; color: {COLORS['text_tertiary']}; font-weight: 500; margin-bottom: 8px;">
-                    SOURCES:
-                </div>
-                {source_tags}
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_sources_html(tuple(sources)), unsafe_allow_html=True)
     elif role == "error":
         st.markdown(format_error_message(content), unsafe_allow_html=True)
 
@@ -191,61 +301,35 @@ def render_input_area(
     return user_input or ""
 
 
-def render_sidebar() -> dict:
+def render_sidebar(on_rebuild: Optional[Callable] = None) -> dict:
     """
     Render the sidebar with title and about info.
 
+    Args:
+        on_rebuild: Optional callback; shows a "Rebuild Index" button when given
+
     Returns:
         Empty dictionary
     """
     with st.sidebar:
-        st.markdown(f"""
-        <div style="
-            text-align: center;
-            padding: 20px 0;
-            margin-bottom: 20px;
-            border-bottom: 1px solid {COLORS['border_subtle']};
-        ">
-            <div style="
-                background: linear-gradient(135deg, {COLORS['primary_start']}, {COLORS['primary_mid']}, {COLORS['primary_end']});
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                font-size: 20px;
-                font-weight: 700;
-            ">
-                {get_ui_config().app_title}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_sidebar_title_html(get_ui_config().app_title), unsafe_allow_html=True)
+
+        # Knowledge base maintenance
+        if on_rebuild:
+            if st.button("Rebuild Index", key="sidebar_rebuild", use_container_width=True):
+                on_rebuild()
+                st.rerun()
 
         # About section
         st.markdown("---")
-        st.markdown("""
-        <div style="text-align: center; padding: 20px 0;">
-            <div style="font-size: 12px; color: {text_tertiary};">
-                <strong>{app_title}</strong><br>
-                RAG-based Policy Assistant<br>
-                <br>
-                Built with Streamlit + Groq
-            </div>
-        </div>
-        """.format(app_title=get_ui_config().app_title, **COLORS), unsafe_allow_html=True)
+        st.markdown(_sidebar_about_html(get_ui_config().app_title), unsafe_allow_html=True)
 
     return {}
 
 
 def render_footer() -> None:
     """Render the footer with attribution."""
-    st.markdown(f"""
-    <div style="
-        text-align: center;
-        padding: 20px;
-        color: {COLORS['text_tertiary']};
-        font-size: 12px;
-    ">
-        Powered by {get_ui_config().app_title} • RAG-based Academic Policy Assistant
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_footer_html(get_ui_config().app_title), unsafe_allow_html=True)
 
 
 def render_error_state(error_message: str) -> None:
@@ -281,18 +365,4 @@ def render_loading_state(message: str = "Loading...") -> None:
     Args:
         message: Loading message to display
     """
-    st.markdown(f"""
-    <div style="
-        text-align: center;
-        padding: 60px 20px;
-    ">
-        <div class="typing-indicator" style="justify-content: center; margin-bottom: 20px;">
-            <div class="typing-dot"></div>
-            <div class="typing-dot"></div>
-            <div class="typing-dot"></div>
-        </div>
-        <div style="color: {COLORS['text_secondary']};">
-            {message}
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_loading_html(message), unsafe_allow_html=True)
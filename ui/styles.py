@@ -5,6 +5,10 @@ CSS styling for the Streamlit application.
 Adapted from the React frontend design with glassmorphism effects.
 """
 
+import re
+from functools import lru_cache
+from html import escape
+
 from config import get_ui_config
 
 # Get configuration for dynamic colors
@@ -255,21 +259,48 @@ def get_custom_scrollbar_css() -> str:
     """
 
 
+# CSS minification: comments, whitespace runs, and whitespace around
+# punctuation that never needs it. Whitespace before ":" is kept, since
+# "a :hover" and "a:hover" are different selectors.
+_RE_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_RE_CSS_SPACE = re.compile(r"\s+")
+_RE_CSS_PUNCT_SPACE = re.compile(r"\s*([{};,>])\s*|(:)\s+")
+
+
+def _minify_css(css: str) -> str:
+    """
+    Strip comments and redundant whitespace from CSS.
+
+    Args:
+        css: CSS (optionally wrapped in <style> tags)
+
+    Returns:
+        Minified CSS
+    """
+    css = _RE_CSS_COMMENT.sub("", css)
+    css = _RE_CSS_SPACE.sub(" ", css)
+    return _RE_CSS_PUNCT_SPACE.sub(lambda m: m.group(1) or m.group(2), css).strip()
+
+
+@lru_cache(maxsize=1)
 def get_all_css() -> str:
     """
     Combine all CSS into a single string for injection.
 
+    The CSS only depends on COLORS, which is fixed at import, so it is
+    assembled and minified once and reused on every rerun.
+
     Returns:
         Complete CSS string for use in st.markdown()
     """
-    return "".join([
+    return _minify_css("".join([
         get_gradient_css(),
         get_glassmorphism_css(),
         get_message_css(),
         get_source_tag_css(),
         get_typing_indicator_css(),
         get_custom_scrollbar_css(),
-    ])
+    ]))
 
 
 def inject_custom_css():
@@ -281,15 +312,18 @@ def inject_custom_css():
     st.markdown(get_all_css(), unsafe_allow_html=True)
 
 
+# Chat message templates, parsed once; formatting a message is a single
+# substitution. Kept on one line to avoid sending indentation to the browser.
+_USER_TEMPLATE = '<div class="message-container"><div class="message-user">{content}</div></div>'
+_ASSISTANT_TEMPLATE = '<div class="message-container"><div class="message-assistant">{content}{sources}</div></div>'
+_ERROR_TEMPLATE = '<div class="message-container"><div class="message-error">{content}</div></div>'
+_SOURCES_TEMPLATE = '<div class="sources-container">{tags}</div>'
+_SOURCE_TAG_TEMPLATE = '<span class="source-tag">{}</span>'
+
+
 def format_user_message(content: str) -> str:
     """Format a user message for display."""
-    return f"""
-    <div class="message-container">
-        <div class="message-user">
-            {content}
-        </div>
-    </div>
-    """
+    return _USER_TEMPLATE.format_map({"content": content})
 
 
 def format_assistant_message(content: str, sources: list = None) -> str:
@@ -309,28 +343,19 @@ def format_assistant_message(content: str, sources: list = None) -> str:
 
     source_html = ""
     if sources:
-        source_tags = "".join([f'<span class="source-tag">{source}</span>' for source in sources])
-        source_html = f'<div class="sources-container">{source_tags}</div>'
+        # Sources are file names and URLs; escape them so they display as text
+        if len(sources) == 1:
+            source_tags = _SOURCE_TAG_TEMPLATE.format(escape(sources[0]))
+        else:
+            source_tags = "".join([_SOURCE_TAG_TEMPLATE.format(escape(source)) for source in sources])
+        source_html = _SOURCES_TEMPLATE.format_map({"tags": source_tags})
 
-    return f"""
-    <div class="message-container">
-        <div class="message-assistant">
-            {formatted_content}
-            {source_html}
-        </div>
-    </div>
-    """
+    return _ASSISTANT_TEMPLATE.format_map({"content": formatted_content, "sources": source_html})
 
 
 def format_error_message(content: str) -> str:
     """Format an error message for display."""
-    return f"""
-    <div class="message-container">
-        <div class="message-error">
-            {content}
-        </div>
-    </div>
-    """
+    return _ERROR_TEMPLATE.format_map({"content": content})
 
 
 def get_typing_indicator_html() -> str:
@@ -4,13 +4,72 @@ Z.M.ai - Logger Utility
 Provides logging utilities for the application.
 """
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Optional
 
 from config import LoggingConfig
 
+# Shared by every handler setup_logger creates
+_FORMATTER = logging.Formatter(
+    "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+# Log files rotate at 10 MB, keeping 3 old files
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUPS = 3
+# Records buffered before a file write (ERROR and above are written at once)
+LOG_FILE_BUFFER = 512
+
+# Background writers for log files, one per file
+_file_listeners: dict[Path, QueueListener] = {}
+
+
+def _file_queue_handler(log_file: Path, log_level: int) -> QueueHandler:
+    """
+    Get a handler that queues records for a background writer to log_file.
+
+    Logging threads only enqueue the record; the listener's thread buffers
+    records and writes them to the rotating file in batches, right away for
+    ERROR and above. Queued and buffered records are flushed at exit.
+
+    Args:
+        log_file: File to write logs to
+        log_level: Minimum level to write
+
+    Returns:
+        QueueHandler feeding the file's listener
+    """
+    log_file = log_file.resolve()
+    listener = _file_listeners.get(log_file)
+
+    if listener is None:
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS
+        )
+        file_handler.setFormatter(_FORMATTER)
+        buffered_handler = MemoryHandler(
+            LOG_FILE_BUFFER, flushLevel=logging.ERROR, target=file_handler
+        )
+
+        listener = QueueListener(queue.SimpleQueue(), buffered_handler)
+        listener.start()
+        # Runs LIFO: the listener drains the queue first, then the buffer
+        # is written out
+        atexit.register(buffered_handler.close)
+        atexit.register(listener.stop)
+        _file_listeners[log_file] = listener
+
+    queue_handler = QueueHandler(listener.queue)
+    queue_handler.setLevel(log_level)
+    return queue_handler
+
 
 def setup_logger(
     name: str = "zmai",
@@ -41,25 +100,19 @@ def setup_logger(
 
     logger.setLevel(log_level)
 
-    # Create formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    # The logger has its own handlers; propagating would also run the root
+    # handlers (set up by basicConfig) and print every record twice
+    logger.propagate = False
 
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(_FORMATTER)
     logger.addHandler(console_handler)
 
-    # File handler (optional)
+    # File handler (optional), written from a background thread
     if log_file:
-        log_file.parent.mkdir(parents=True, exist_ok=True)
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(log_level)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        logger.addHandler(_file_queue_handler(log_file, log_level))
 
     return logger
 
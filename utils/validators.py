@@ -4,13 +4,44 @@ Z.M.ai - Validation Utilities
 Provides input validation and sanitization functions.
 """
 
+import os
 import re
+import stat
 import logging
 from typing import Optional, List
 from pathlib import Path
+from urllib.parse import urlsplit
 
 logger = logging.getLogger(__name__)
 
+# Compiled once at import; validate_query runs on every user message.
+# A single alternation, so the query is scanned once rather than per pattern.
+_DANGEROUS_PATTERN = re.compile(
+    r"<script[^>]*>.*?</script>"  # Script tags
+    r"|javascript:"  # JavaScript protocol
+    r"|on\w+\s*=",  # Event handlers
+    re.IGNORECASE,
+)
+
+# Hosts accepted by validate_url: domain names, localhost and IPv4 addresses.
+# Only the host part is matched; urlsplit handles the rest of the URL.
+_HOST_PATTERN = re.compile(
+    r"(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,6}\.?"  # domain
+    r"|localhost"  # localhost
+    r"|\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}"  # IP
+)
+_WHITESPACE = re.compile(r"\s")
+
+# Supported Groq models, for O(1) membership checks; the tuple keeps the
+# order used in the error message
+_VALID_MODEL_NAMES = (
+    "llama-3.1-8b-instant",
+    "llama-3.1-70b-versatile",
+    "mixtral-8x7b-32768",
+)
+_VALID_MODELS = frozenset(_VALID_MODEL_NAMES)
+_VALID_MODELS_TEXT = ", ".join(_VALID_MODEL_NAMES)
+
 
 def validate_api_key(api_key: str) -> bool:
     """
@@ -55,16 +86,9 @@ def validate_query(query: str) -> tuple[bool, Optional[str]]:
         return False, "Query is too long (maximum 2000 characters)"
 
     # Check for obviously malicious patterns
-    dangerous_patterns = [
-        r"<script[^>]*>.*?</script>",  # Script tags
-        r"javascript:",  # JavaScript protocol
-        r"on\w+\s*=",  # Event handlers
-    ]
-
-    for pattern in dangerous_patterns:
-        if re.search(pattern, query, re.IGNORECASE):
-            logger.warning(f"Potentially malicious query detected: {query[:50]}...")
-            return False, "Query contains invalid content"
+    if _DANGEROUS_PATTERN.search(query):
+        logger.warning(f"Potentially malicious query detected: {query[:50]}...")
+        return False, "Query contains invalid content"
 
     return True, None
 
@@ -82,10 +106,9 @@ def sanitize_query(query: str) -> str:
     # Remove null bytes
     query = query.replace("\x00", "")
 
-    # Normalize whitespace
-    query = " ".join(query.split())
-
-    return query.strip()
+    # Normalize whitespace. split()/join is measurably faster here than a
+    # \s+ regex, and its result never has leading or trailing whitespace.
+    return " ".join(query.split())
 
 
 def validate_file_path(file_path: str | Path, must_exist: bool = True) -> tuple[bool, Optional[str]]:
@@ -99,12 +122,16 @@ def validate_file_path(file_path: str | Path, must_exist: bool = True) -> tuple[
     Returns:
         Tuple of (is_valid, error_message)
     """
-    path = Path(file_path)
-
-    if must_exist and not path.exists():
-        return False, f"File does not exist: {file_path}"
-
-    if path.exists() and not path.is_file():
+    # One stat call answers both "exists" and "is a file"
+    try:
+        mode = os.stat(file_path).st_mode
+    except (OSError, ValueError):
+        # Treated as missing, as Path.exists() does
+        if must_exist:
+            return False, f"File does not exist: {file_path}"
+        return True, None
+
+    if not stat.S_ISREG(mode):
         return False, f"Path is not a file: {file_path}"
 
     return True, None
@@ -123,19 +150,23 @@ def validate_url(url: str) -> tuple[bool, Optional[str]]:
     if not url:
         return False, "URL cannot be empty"
 
-    # Basic URL pattern
-    url_pattern = re.compile(
-        r"^https?://"  # http:// or https://
-        r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|"  # domain
-        r"localhost|"  # localhost
-        r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"  # IP
-        r"(?::\d+)?"  # optional port
-        r"(?:/?|[/?]\S+)$",
-        re.IGNORECASE,
-    )
+    invalid = False, f"Invalid URL format: {url}"
+
+    if _WHITESPACE.search(url):
+        return invalid
+
+    try:
+        parts = urlsplit(url)
+        parts.port  # Raises ValueError for a malformed port
+    except ValueError:
+        return invalid
 
-    if not url_pattern.match(url):
-        return False, f"Invalid URL format: {url}"
+    # An empty port ("host:") parses as no port at all
+    if parts.scheme not in ("http", "https") or "@" in parts.netloc or parts.netloc.endswith(":"):
+        return invalid
+
+    if not parts.hostname or not _HOST_PATTERN.fullmatch(parts.hostname):
+        return invalid
 
     return True, None
 
@@ -185,14 +216,8 @@ def validate_model_name(model: str) -> tuple[bool, Optional[str]]:
     Returns:
         Tuple of (is_valid, error_message)
     """
-    valid_models = [
-        "llama-3.1-8b-instant",
-        "llama-3.1-70b-versatile",
-        "mixtral-8x7b-32768",
-    ]
-
-    if model not in valid_models:
-        return False, f"Invalid model name. Valid options: {', '.join(valid_models)}"
+    if model not in _VALID_MODELS:
+        return False, f"Invalid model name. Valid options: {_VALID_MODELS_TEXT}"
 
     return True, None
 
@@ -200,11 +225,18 @@ def validate_model_name(model: str) -> tuple[bool, Optional[str]]:
 class ValidationError(Exception):
     """Custom exception for validation errors."""
 
+    # Stored in a slot, so the exception's __dict__ is never materialized
+    __slots__ = ("message",)
+
     def __init__(self, message: str):
         self.message = message
         super().__init__(self.message)
 
 
+# Sentinel for attributes validate_config cannot find
+_MISSING = object()
+
+
 def validate_config(config) -> List[str]:
     """
     Validate configuration object.
@@ -217,21 +249,27 @@ def validate_config(config) -> List[str]:
     """
     errors = []
 
+    # Each attribute is looked up once; _MISSING marks an absent one (None
+    # is a real value, e.g. an unset API key)
+    groq = getattr(config, "groq", _MISSING)
+    rag = getattr(config, "rag", _MISSING)
+
     # Validate API key
-    if hasattr(config, "groq") and hasattr(config.groq, "api_key"):
-        if not validate_api_key(config.groq.api_key):
-            errors.append("Groq API key is invalid or missing")
+    api_key = getattr(groq, "api_key", _MISSING)
+    if api_key is not _MISSING and not validate_api_key(api_key):
+        errors.append("Groq API key is invalid or missing")
 
     # Validate RAG settings
-    if hasattr(config, "rag"):
-        if hasattr(config.rag, "chunk_size"):
-            valid, err = validate_chunk_size(config.rag.chunk_size)
-            if not valid:
-                errors.append(f"Chunk size: {err}")
-
-        if hasattr(config.rag, "similarity_threshold"):
-            valid, err = validate_similarity_threshold(config.rag.similarity_threshold)
-            if not valid:
-                errors.append(f"Similarity threshold: {err}")
+    chunk_size = getattr(rag, "chunk_size", _MISSING)
+    if chunk_size is not _MISSING:
+        valid, err = validate_chunk_size(chunk_size)
+        if not valid:
+            errors.append(f"Chunk size: {err}")
+
+    similarity_threshold = getattr(rag, "similarity_threshold", _MISSING)
+    if similarity_threshold is not _MISSING:
+        valid, err = validate_similarity_threshold(similarity_threshold)
+        if not valid:
+            errors.append(f"Similarity threshold: {err}")
 
     return errors